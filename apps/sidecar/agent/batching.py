@@ -0,0 +1,100 @@
+"""
+Micro-batching
+==============
+Coalesce concurrent calls that share a key into one batched call.
+
+Each caller awaits its own future; the first submission for a key opens
+a short window, and the bucket is flushed when the window closes or it
+reaches max_batch items (or max_batch total weight, when a weight function
+is given), whichever comes first.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+BatchHandler = Callable[[Hashable, list[Any]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """
+    Groups concurrent submissions per key and runs them through `handler`.
+
+    `handler(key, items)` must return one result per item, in order. A
+    result that is an exception instance is raised to that item's caller
+    only; if the handler itself raises, every caller in the batch gets it.
+
+    `weight(item)` sizes each item against max_batch (default: 1 per item),
+    e.g. the estimated token count of a list of texts.
+
+    Example:
+        batcher = MicroBatcher(embed_many, max_batch=32, max_wait=0.01)
+        vector = await batcher.submit(model, text)
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        max_batch: int = 16,
+        max_wait: float = 0.02,
+        weight: Optional[Callable[[Any], int]] = None,
+    ):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.weight = weight
+        self._pending: dict[Hashable, list[tuple[Any, asyncio.Future]]] = {}
+        self._weights: dict[Hashable, int] = {}
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue one item under key and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        bucket = self._pending.get(key)
+        if bucket is None:
+            bucket = self._pending[key] = []
+            self._weights[key] = 0
+            loop.call_later(self.max_wait, self._flush, key, bucket)
+        bucket.append((item, future))
+        self._weights[key] += self.weight(item) if self.weight else 1
+
+        if self._weights[key] >= self.max_batch:
+            self._flush(key, bucket)
+
+        return await future
+
+    def _flush(self, key: Hashable, bucket: list) -> None:
+        # A size-triggered flush may already have taken this bucket
+        if self._pending.get(key) is not bucket:
+            return
+        del self._pending[key]
+        del self._weights[key]
+        task = asyncio.ensure_future(self._run(key, bucket))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, key: Hashable, bucket: list) -> None:
+        try:
+            results = await self.handler(key, [item for item, _ in bucket])
+        except Exception as e:
+            for _, future in bucket:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if len(results) != len(bucket):
+            error = RuntimeError(f"Batch handler returned {len(results)} results for {len(bucket)} items")
+            for _, future in bucket:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(bucket, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
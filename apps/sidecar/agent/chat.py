@@ -7,9 +7,11 @@ When tools are available, runs a multi-turn loop:
   LLM → tool_use → execute tool → feed result → LLM → ... → final text
 """
 
+import os
 import time
 import json
-from typing import Optional
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional
 from dataclasses import dataclass, field
 from agent.providers import AgentProvider, Message, ChatResponse, OllamaProvider, LocalOpenAIProvider
 
@@ -36,6 +38,8 @@ class ChatResult:
 
 
 CONVERSATION_TTL_SECONDS = 3600  # Auto-evict conversations idle for 1 hour
+MAX_CONVERSATIONS = int(os.getenv("MAX_CONVERSATIONS", "1024"))  # LRU cap on live conversations
+MAX_HISTORY = int(os.getenv("MAX_HISTORY", "6"))  # Turns sent to the provider by chat(); 0 = all
 
 
 @dataclass
@@ -46,11 +50,46 @@ class Conversation:
     provider_name: str = "ollama"
     model: Optional[str] = None
     last_accessed: float = field(default_factory=time.time)
+    # Last client-provided history as ((role, content) pairs, Messages), so
+    # the next hydration only builds Messages for the turns added since
+    hydrated_history: Optional[tuple[list, list[Message]]] = None
 
 
 MAX_TOOL_TURNS = 10  # Safety limit to prevent infinite loops
 
 
+class ConversationStore(OrderedDict):
+    """Conversations in least-recently-used order, capped at maxsize."""
+
+    def __init__(self, maxsize: int = MAX_CONVERSATIONS):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, key: str, value: Conversation):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def _history_window(messages: list[Message], max_turns: int = MAX_HISTORY) -> list[Message]:
+    """System messages plus the last max_turns user/assistant turns.
+
+    The window always starts on a plain user message, so it never opens
+    with an orphaned assistant reply or tool result.
+    """
+    if max_turns <= 0:
+        return messages
+    system = [m for m in messages if m.role == "system"]
+    rest = [m for m in messages if m.role != "system"]
+    if len(rest) <= max_turns * 2:
+        return messages
+    start = len(rest) - max_turns * 2
+    while start < len(rest) and not (rest[start].role == "user" and isinstance(rest[start].content, str)):
+        start += 1
+    return system + rest[start:]
+
+
 class ChatService:
     """
     Chat service with conversation memory, provider management, and tool execution.
@@ -62,7 +101,7 @@ class ChatService:
 
     def __init__(self):
         self.providers: dict[str, AgentProvider] = {}
-        self.conversations: dict[str, Conversation] = {}
+        self.conversations: ConversationStore = ConversationStore()
         self.default_provider = "ollama"
 
         # Register default providers
@@ -108,18 +147,34 @@ class ChatService:
             return self.create_conversation(conversation_id, **kwargs)
         conv = self.conversations[conversation_id]
         conv.last_accessed = time.time()
+        self.conversations.move_to_end(conversation_id)
         return conv
 
     def _evict_stale_conversations(self):
         """Remove conversations idle longer than TTL."""
         now = time.time()
-        stale = [cid for cid, c in self.conversations.items()
-                 if now - c.last_accessed > CONVERSATION_TTL_SECONDS]
+        # Oldest first, so stop at the first conversation that is still fresh
+        stale = []
+        for cid, c in self.conversations.items():
+            if now - c.last_accessed <= CONVERSATION_TTL_SECONDS:
+                break
+            stale.append(cid)
         for cid in stale:
             del self.conversations[cid]
         if stale:
             print(f'[chat] Evicted {len(stale)} stale conversations (>{CONVERSATION_TTL_SECONDS}s idle)')
 
+    @staticmethod
+    def _append_user_turn(conv: Conversation, user_message: str, context: Optional[str]):
+        """Append the user turn, with any per-turn context as its own message.
+
+        Context never goes into the system prompt, so the system prompt and
+        earlier turns stay byte-identical and provider prompt caches keep hitting.
+        """
+        if context:
+            conv.messages.append(Message(role="user", content=f"<context>\n{context}\n</context>"))
+        conv.messages.append(Message(role="user", content=user_message))
+
     async def chat(
         self,
         conversation_id: str,
@@ -128,21 +183,27 @@ class ChatService:
         model: Optional[str] = None,
         temperature: float = 0.7,
         tools: Optional[list[dict]] = None,
+        context: Optional[str] = None,
+        provider_override: Optional[AgentProvider] = None,
     ) -> ChatResponse:
         """
         Simple chat — no tool execution loop. Backward compatible.
+
+        provider_override serves this call with a per-request provider (e.g.
+        one built from a request's api_key) without registering it, so
+        concurrent requests never swap the shared provider under each other.
         """
         conv = self.get_or_create_conversation(conversation_id)
 
         # Add user message to history
-        conv.messages.append(Message(role="user", content=user_message))
+        self._append_user_turn(conv, user_message, context)
 
         # Get provider
-        provider = self.get_provider(provider_name or conv.provider_name)
+        provider = provider_override or self.get_provider(provider_name or conv.provider_name)
 
         # Get response
         response = await provider.chat(
-            messages=conv.messages,
+            messages=_history_window(conv.messages),
             model=model or conv.model,
             temperature=temperature,
             tools=tools,
@@ -153,6 +214,38 @@ class ChatService:
 
         return response
 
+    async def chat_stream(
+        self,
+        conversation_id: str,
+        user_message: str,
+        provider_name: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        context: Optional[str] = None,
+        provider_override: Optional[AgentProvider] = None,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Streaming variant of chat(): yields the provider's token/done chunks.
+        The assistant reply is added to history once the stream completes.
+        """
+        conv = self.get_or_create_conversation(conversation_id)
+        self._append_user_turn(conv, user_message, context)
+
+        provider = provider_override or self.get_provider(provider_name or conv.provider_name)
+
+        accumulated = []
+        async for chunk in provider.chat_stream(
+            messages=_history_window(conv.messages),
+            model=model or conv.model,
+            temperature=temperature,
+        ):
+            if chunk["type"] == "token":
+                accumulated.append(chunk["content"])
+            elif chunk["type"] == "done":
+                content = chunk.get("content") or "".join(accumulated)
+                conv.messages.append(Message(role="assistant", content=content))
+            yield chunk
+
     async def chat_with_tools(
         self,
         conversation_id: str,
@@ -164,6 +257,8 @@ class ChatService:
         tool_registry=None,
         mcp_client=None,
         event_bus=None,
+        context: Optional[str] = None,
+        provider_override: Optional[AgentProvider] = None,
     ) -> ChatResult:
         """
         Chat with tool execution loop.
@@ -178,9 +273,9 @@ class ChatService:
         conv = self.get_or_create_conversation(conversation_id)
 
         # Add user message
-        conv.messages.append(Message(role="user", content=user_message))
+        self._append_user_turn(conv, user_message, context)
 
-        provider = self.get_provider(provider_name or conv.provider_name)
+        provider = provider_override or self.get_provider(provider_name or conv.provider_name)
         all_tool_calls: list[ToolCallRecord] = []
         total_input = 0
         total_output = 0
@@ -8,6 +8,8 @@ import asyncio
 import httpx
 from typing import Optional
 
+from .providers.base import HTTP2_AVAILABLE
+
 
 class EmbedResult:
     def __init__(self, vectors: list[list[float]], model: str, dimensions: int, usage: dict):
@@ -20,11 +22,44 @@ class EmbedResult:
 class EmbeddingClient:
     """Base embedding client. Subclasses implement _embed_batch()."""
 
-    def __init__(self, base_url: str, api_key: str = '', max_batch: int = 100):
+    def __init__(self, base_url: str, api_key: str = '', max_batch: int = 100, max_concurrency: int = 8):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.max_batch = max_batch
+        self.max_concurrency = max_concurrency  # batches in flight at once
         self.max_tokens_per_text = 8191
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive client shared by all batches from this client."""
+        if self._client is None or self._client.is_closed:
+            self._client = self.new_client()
+        return self._client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        """Use a pooled client owned (and closed) by the caller."""
+        self._client = client
+
+    @property
+    def client_key(self) -> tuple:
+        """Settings new_client() depends on; equal keys can share one client."""
+        return ("embedding", HTTP2_AVAILABLE)
+
+    def new_client(self) -> httpx.AsyncClient:
+        """Build a keep-alive client for embedding batches."""
+        return httpx.AsyncClient(
+            timeout=60.0,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+
+    async def aclose(self):
+        """Close the pooled client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def embed(self, texts: list[str], model: str) -> EmbedResult:
         """Embed texts with automatic batching, truncation, and retry."""
@@ -42,14 +77,24 @@ class EmbeddingClient:
         if warnings:
             print(f'[embed] Truncated {len(warnings)} text(s) exceeding {self.max_tokens_per_text} token limit')
 
-        # Batch and embed
-        all_vectors: list[list[float]] = []
-        total_usage = {'prompt_tokens': 0, 'total_tokens': 0}
+        # Batch by length so each request carries similar-sized texts (less
+        # padding on local servers), then send batches concurrently
+        order = sorted(range(len(truncated)), key=lambda i: len(truncated[i]))
+        batches = [order[k:k + self.max_batch] for k in range(0, len(order), self.max_batch)]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(indices: list[int]):
+            async with semaphore:
+                return await self._embed_with_retry([truncated[i] for i in indices], model)
 
-        for batch_start in range(0, len(truncated), self.max_batch):
-            batch = truncated[batch_start:batch_start + self.max_batch]
-            vectors, usage = await self._embed_with_retry(batch, model)
-            all_vectors.extend(vectors)
+        results = await asyncio.gather(*(run(indices) for indices in batches))
+
+        # Put vectors back in input order
+        all_vectors: list[list[float]] = [None] * len(truncated)
+        total_usage = {'prompt_tokens': 0, 'total_tokens': 0}
+        for indices, (vectors, usage) in zip(batches, results):
+            for i, vector in zip(indices, vectors):
+                all_vectors[i] = vector
             total_usage['prompt_tokens'] += usage.get('prompt_tokens', 0)
             total_usage['total_tokens'] += usage.get('total_tokens', 0)
 
@@ -102,17 +147,17 @@ class AzureOpenAIEmbeddingClient(EmbeddingClient):
     async def _embed_batch(self, texts: list[str], model: str) -> tuple[list[list[float]], dict]:
         deploy_name = self.deployment or model  # Use deployment override, fallback to model
         url = f'{self.base_url}/openai/deployments/{deploy_name}/embeddings?api-version={self.api_version}'
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(
-                url,
-                json={'input': texts},
-                headers={'api-key': self.api_key, 'Content-Type': 'application/json'},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            vectors = [item['embedding'] for item in data['data']]
-            usage = data.get('usage', {})
-            return vectors, usage
+        client = self.client
+        resp = await client.post(
+            url,
+            json={'input': texts},
+            headers={'api-key': self.api_key, 'Content-Type': 'application/json'},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        vectors = [item['embedding'] for item in data['data']]
+        usage = data.get('usage', {})
+        return vectors, usage
 
 
 class OpenAICompatibleEmbeddingClient(EmbeddingClient):
@@ -127,17 +172,47 @@ class OpenAICompatibleEmbeddingClient(EmbeddingClient):
         if self.api_key:
             headers['Authorization'] = f'Bearer {self.api_key}'
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(
-                url,
-                json={'input': texts, 'model': model},
-                headers=headers,
-            )
+        client = self.client
+        resp = await client.post(
+            url,
+            json={'input': texts, 'model': model},
+            headers=headers,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        vectors = [item['embedding'] for item in data['data']]
+        usage = data.get('usage', {})
+        return vectors, usage
+
+
+class OllamaEmbeddingClient(EmbeddingClient):
+    """Ollama's native batch endpoint (/api/embed): one round-trip per batch."""
+
+    def __init__(self, base_url: str, max_batch: int = 32):
+        # Native API lives at the server root, not under the OpenAI-style /v1
+        base_url = base_url.rstrip('/')
+        if base_url.endswith('/v1'):
+            base_url = base_url[:-3]
+        super().__init__(base_url=base_url, max_batch=max_batch)
+
+    async def _embed_batch(self, texts: list[str], model: str) -> tuple[list[list[float]], dict]:
+        client = self.client
+        resp = await client.post(f'{self.base_url}/api/embed', json={'model': model, 'input': texts})
+        # Servers older than /api/embed answer 404; use the per-text endpoint
+        if resp.status_code != 404:
             resp.raise_for_status()
             data = resp.json()
-            vectors = [item['embedding'] for item in data['data']]
-            usage = data.get('usage', {})
-            return vectors, usage
+            if 'embeddings' in data:
+                tokens = data.get('prompt_eval_count', 0)
+                return data['embeddings'], {'prompt_tokens': tokens, 'total_tokens': tokens}
+
+        async def legacy(text: str) -> list[float]:
+            r = await client.post(f'{self.base_url}/api/embeddings', json={'model': model, 'prompt': text})
+            r.raise_for_status()
+            return r.json()['embedding']
+
+        vectors = await asyncio.gather(*(legacy(text) for text in texts))
+        return list(vectors), {}
 
 
 def create_embedding_client(
@@ -164,9 +239,8 @@ def create_embedding_client(
             max_batch=32 if provider == 'local' else 100,
         )
     elif provider == 'ollama':
-        return OpenAICompatibleEmbeddingClient(
-            base_url=base_url or 'http://localhost:11434/v1',
-            api_key='',
+        return OllamaEmbeddingClient(
+            base_url=base_url or 'http://localhost:11434',
             max_batch=32,
         )
     else:
@@ -14,6 +14,11 @@ from datetime import datetime, timezone
 from typing import Optional
 
 
+# Per-subscriber backlog. A slow client loses its oldest events (visible as
+# gaps in seq) rather than growing memory or being cut off.
+SUBSCRIBER_QUEUE_SIZE = 1024
+
+
 class EventBus:
     """Broadcasts events to all subscribed WebSocket queues."""
 
@@ -22,7 +27,7 @@ class EventBus:
         self._seq_counters: dict[str, int] = {}
 
     def subscribe(self) -> asyncio.Queue:
-        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
         self._subscribers.add(queue)
         return queue
 
@@ -54,14 +59,9 @@ class EventBus:
         }
 
         msg = json.dumps(event)
-        dead: list[asyncio.Queue] = []
         for queue in self._subscribers:
-            try:
-                queue.put_nowait(msg)
-            except asyncio.QueueFull:
-                dead.append(queue)
-
-        for q in dead:
-            self._subscribers.discard(q)
+            if queue.full():
+                queue.get_nowait()  # drop oldest
+            queue.put_nowait(msg)
 
         return event
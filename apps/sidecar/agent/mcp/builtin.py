@@ -5,7 +5,6 @@ Wraps the existing shell + filesystem tools as MCP-compatible ToolDefinitions.
 These run in-process (no subprocess overhead).
 """
 
-import json
 from .registry import ToolRegistry, ToolDefinition
 from agent.tools import ShellTool, FilesystemTool
 
@@ -31,21 +30,22 @@ def register_builtin_tools(
         return output.strip() or "(no output)"
 
     async def handle_read_file(path: str) -> str:
-        result = fs_tool.read(path)
+        result = await fs_tool.read(path)
         if result.success:
             return result.data or "(empty file)"
         return f"Error: {result.error}"
 
     async def handle_write_file(path: str, content: str) -> str:
-        result = fs_tool.write(path, content)
+        result = await fs_tool.write(path, content)
         if result.success:
             return f"Written to {path}"
         return f"Error: {result.error}"
 
     async def handle_list_dir(path: str) -> str:
-        result = fs_tool.list_dir(path)
+        result = await fs_tool.list_dir(path)
         if result.success:
-            return json.dumps(result.data) if result.data else "(empty directory)"
+            # list_dir already returns a JSON array
+            return result.data if result.data != "[]" else "(empty directory)"
         return f"Error: {result.error}"
 
     registry.register_many([
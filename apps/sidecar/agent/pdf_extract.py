@@ -0,0 +1,100 @@
+"""
+PDF text extraction helpers.
+
+Kept apart from server.py so the spawn workers that extract page ranges of
+long PDFs only import this module, not the whole FastAPI app.
+"""
+
+import mmap
+import threading
+from typing import Optional
+
+
+# PDFium is not thread-safe: every call into it (open, page text, close)
+# from the server's extract threads goes through this lock. Worker
+# processes each have their own PDFium, so page ranges still run in parallel.
+_PDFIUM_LOCK = threading.RLock()
+
+
+def open_pdf(path: str):
+    """Open with PDFium (native, much faster) when installed, else pypdf.
+
+    Files PDFium rejects (some encrypted or malformed PDFs) also go to pypdf.
+    """
+    try:
+        import pypdfium2 as pdfium
+        with _PDFIUM_LOCK:
+            return pdfium.PdfDocument(path)
+    except Exception:
+        # Not installed, or a file PDFium can't open
+        pass
+    from pypdf import PdfReader
+    return PdfReader(read_mmap(path) or path)
+
+
+def read_mmap(path: str) -> Optional[mmap.mmap]:
+    """Read-only map of a file, or None for an empty file mmap can't map.
+
+    pypdf copies a path's whole file into a BytesIO; handed a map it reads
+    pages straight out of the OS page cache. close_pdf() unmaps it, since
+    PdfReader.close() leaves streams it was given open (and an open map
+    keeps the file locked on Windows).
+    """
+    with open(path, 'rb') as f:
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+
+
+def page_count(doc) -> int:
+    """Number of pages in a document from open_pdf."""
+    if hasattr(doc, 'pages'):
+        return len(doc.pages)
+    with _PDFIUM_LOCK:
+        return len(doc)
+
+
+def page_texts(doc, lo: int, hi: int) -> list[str]:
+    """Text of pages [lo, hi) of a document from open_pdf."""
+    from pypdf import PdfReader
+    if isinstance(doc, PdfReader):
+        return [doc.pages[i].extract_text() or '' for i in range(lo, hi)]
+
+    texts = []
+    with _PDFIUM_LOCK:
+        for i in range(lo, hi):
+            page = doc[i]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    texts.append(textpage.get_text_range().replace('\r\n', '\n'))
+                finally:
+                    textpage.close()
+            finally:
+                page.close()
+    return texts
+
+
+def close_pdf(doc) -> None:
+    """Close a document from open_pdf, including the map behind a pypdf reader."""
+    from pypdf import PdfReader
+    if not isinstance(doc, PdfReader):
+        with _PDFIUM_LOCK:
+            doc.close()
+        return
+
+    # PdfReader.close() only closes streams it opened itself
+    stream = doc.stream
+    doc.close()
+    if isinstance(stream, mmap.mmap):
+        stream.close()
+
+
+def pdf_page_texts(path: str, lo: int, hi: int) -> list[str]:
+    """Text of pages [lo, hi). Runs in a worker process with its own document."""
+    doc = open_pdf(path)
+    try:
+        return page_texts(doc, lo, hi)
+    finally:
+        close_pdf(doc)
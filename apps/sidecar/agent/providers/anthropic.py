@@ -20,17 +20,20 @@ class AnthropicProvider(AgentProvider):
     """
 
     name = "anthropic"
+    http2 = True
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         default_model: str = "claude-sonnet-4-20250514",
         timeout: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.default_model = default_model
         self.timeout = timeout
         self.base_url = "https://api.anthropic.com"
+        self._client = client
 
     def _convert_messages(self, messages: list[Message]) -> tuple[list[dict], Optional[str]]:
         """Convert messages to Anthropic format. Returns (chat_messages, system_content)."""
@@ -62,6 +65,13 @@ class AnthropicProvider(AgentProvider):
                 chat_messages.append({"role": m.role, "content": m.content})
         return chat_messages, system_content
 
+    @staticmethod
+    def _system_blocks(system_content: str) -> list[dict]:
+        """System prompt as a cache breakpoint: tools + system form a stable
+        prefix, so Anthropic can serve it from its prompt cache on later turns.
+        """
+        return [{"type": "text", "text": system_content, "cache_control": {"type": "ephemeral"}}]
+
     async def chat(
         self,
         messages: list[Message],
@@ -77,58 +87,58 @@ class AnthropicProvider(AgentProvider):
         model = model or self.default_model
         chat_messages, system_content = self._convert_messages(messages)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            payload = {
-                "model": model,
-                "messages": chat_messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-            }
-            if system_content:
-                payload["system"] = system_content
-            if tools:
-                payload["tools"] = tools
-
-            response = await client.post(
-                f"{self.base_url}/v1/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse response content blocks
-            content_blocks = data.get("content", [])
-            stop_reason = data.get("stop_reason", "end_turn")
-
-            text_parts = []
-            tool_calls = []
-            for block in content_blocks:
-                if block["type"] == "text":
-                    text_parts.append(block["text"])
-                elif block["type"] == "tool_use":
-                    tool_calls.append({
-                        "id": block["id"],
-                        "name": block["name"],
-                        "input": block["input"],
-                    })
-
-            return ChatResponse(
-                content="\n".join(text_parts) if text_parts else "",
-                model=model,
-                provider=self.name,
-                usage={
-                    "prompt_tokens": data["usage"]["input_tokens"],
-                    "completion_tokens": data["usage"]["output_tokens"],
-                },
-                tool_calls=tool_calls if tool_calls else None,
-                stop_reason=stop_reason,
-                raw_content=content_blocks if tool_calls else None,
-            )
+        client = self.client
+        payload = {
+            "model": model,
+            "messages": chat_messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+        if system_content:
+            payload["system"] = self._system_blocks(system_content)
+        if tools:
+            payload["tools"] = tools
+
+        response = await client.post(
+            f"{self.base_url}/v1/messages",
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json=payload,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Parse response content blocks
+        content_blocks = data.get("content", [])
+        stop_reason = data.get("stop_reason", "end_turn")
+
+        text_parts = []
+        tool_calls = []
+        for block in content_blocks:
+            if block["type"] == "text":
+                text_parts.append(block["text"])
+            elif block["type"] == "tool_use":
+                tool_calls.append({
+                    "id": block["id"],
+                    "name": block["name"],
+                    "input": block["input"],
+                })
+
+        return ChatResponse(
+            content="\n".join(text_parts) if text_parts else "",
+            model=model,
+            provider=self.name,
+            usage={
+                "prompt_tokens": data["usage"]["input_tokens"],
+                "completion_tokens": data["usage"]["output_tokens"],
+            },
+            tool_calls=tool_calls if tool_calls else None,
+            stop_reason=stop_reason,
+            raw_content=content_blocks if tool_calls else None,
+        )
 
     async def chat_stream(
         self,
@@ -152,70 +162,71 @@ class AnthropicProvider(AgentProvider):
             "stream": True,
         }
         if system_content:
-            payload["system"] = system_content
-
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/v1/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
+            payload["system"] = self._system_blocks(system_content)
+
+        client = self.client
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/v1/messages",
+            headers={
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "content-type": "application/json",
+            },
+            json=payload,
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            input_tokens = 0
+            output_tokens = 0
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if not line or line.startswith("event:"):
+                    continue
+                if not line.startswith("data: "):
+                    continue
+                chunk = json.loads(line[6:])
+                chunk_type = chunk.get("type")
+                if chunk_type == "message_start":
+                    msg_usage = chunk.get("message", {}).get("usage", {})
+                    input_tokens = msg_usage.get("input_tokens", 0)
+                elif chunk_type == "content_block_delta":
+                    delta = chunk.get("delta", {})
+                    if delta.get("type") == "text_delta":
+                        token = delta.get("text", "")
+                        if token:
+                            accumulated += token
+                            yield {'type': 'token', 'content': token, 'index': index}
+                            index += 1
+                elif chunk_type == "message_delta":
+                    output_tokens = chunk.get("usage", {}).get("output_tokens", 0)
+                elif chunk_type == "message_stop":
+                    break
+            yield {
+                'type': 'done',
+                'content': accumulated,
+                'usage': {
+                    'prompt_tokens': input_tokens,
+                    'completion_tokens': output_tokens,
                 },
-                json=payload,
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                input_tokens = 0
-                output_tokens = 0
-                async for line in response.aiter_lines():
-                    line = line.strip()
-                    if not line or line.startswith("event:"):
-                        continue
-                    if not line.startswith("data: "):
-                        continue
-                    chunk = json.loads(line[6:])
-                    chunk_type = chunk.get("type")
-                    if chunk_type == "message_start":
-                        msg_usage = chunk.get("message", {}).get("usage", {})
-                        input_tokens = msg_usage.get("input_tokens", 0)
-                    elif chunk_type == "content_block_delta":
-                        delta = chunk.get("delta", {})
-                        if delta.get("type") == "text_delta":
-                            token = delta.get("text", "")
-                            if token:
-                                accumulated += token
-                                yield {'type': 'token', 'content': token, 'index': index}
-                                index += 1
-                    elif chunk_type == "message_delta":
-                        output_tokens = chunk.get("usage", {}).get("output_tokens", 0)
-                    elif chunk_type == "message_stop":
-                        break
-                yield {
-                    'type': 'done',
-                    'content': accumulated,
-                    'usage': {
-                        'prompt_tokens': input_tokens,
-                        'completion_tokens': output_tokens,
-                    },
-                }
+            }
 
     async def health(self) -> bool:
         """Check if API key is valid by calling the models endpoint"""
         if not self.api_key:
             return False
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                r = await client.get(
-                    f"{self.base_url}/v1/models",
-                    headers={
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01",
-                    },
-                )
-                return r.status_code == 200
+            client = self.client
+            r = await client.get(
+                f"{self.base_url}/v1/models",
+                headers={
+                    "x-api-key": self.api_key,
+                    "anthropic-version": "2023-06-01",
+                },
+                timeout=10.0,
+            )
+            return r.status_code == 200
         except Exception:
             return False
 
@@ -18,6 +18,7 @@ class AzureOpenAIProvider(AgentProvider):
     """
 
     name = "azure_openai"
+    http2 = True
 
     def __init__(
         self,
@@ -26,12 +27,14 @@ class AzureOpenAIProvider(AgentProvider):
         deployment: str = "",
         api_version: str = "2024-08-01-preview",
         timeout: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.endpoint = endpoint.rstrip("/")
         self.api_key = api_key
         self.deployment = deployment
         self.api_version = api_version
         self.timeout = timeout
+        self._client = client
 
     async def chat(
         self,
@@ -51,31 +54,31 @@ class AzureOpenAIProvider(AgentProvider):
             f"/chat/completions?api-version={self.api_version}"
         )
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                url,
-                headers={
-                    "api-key": self.api_key,
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+        client = self.client
+        response = await client.post(
+            url,
+            headers={
+                "api-key": self.api_key,
+                "Content-Type": "application/json",
+            },
+            json={
+                "messages": [{"role": m.role, "content": m.content} for m in messages],
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
 
-            return ChatResponse(
-                content=data["choices"][0]["message"]["content"],
-                model=deployment,
-                provider=self.name,
-                usage={
-                    "prompt_tokens": data["usage"]["prompt_tokens"],
-                    "completion_tokens": data["usage"]["completion_tokens"],
-                },
-            )
+        return ChatResponse(
+            content=data["choices"][0]["message"]["content"],
+            model=deployment,
+            provider=self.name,
+            usage={
+                "prompt_tokens": data["usage"]["prompt_tokens"],
+                "completion_tokens": data["usage"]["completion_tokens"],
+            },
+        )
 
     async def chat_stream(
         self,
@@ -94,61 +97,62 @@ class AzureOpenAIProvider(AgentProvider):
             f"/chat/completions?api-version={self.api_version}"
         )
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                url,
-                headers={
-                    "api-key": self.api_key,
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "stream": True,
-                    "stream_options": {"include_usage": True},
-                },
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                usage = {}
-                async for line in response.aiter_lines():
-                    line = line.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data: "):
-                        continue
-                    data = line[6:]
-                    if data == "[DONE]":
-                        break
-                    chunk = json.loads(data)
-                    if chunk.get("usage"):
-                        usage = {
-                            "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
-                            "completion_tokens": chunk["usage"].get("completion_tokens", 0),
-                        }
-                    choices = chunk.get("choices", [])
-                    if choices:
-                        token = choices[0].get("delta", {}).get("content", "")
-                        if token:
-                            accumulated += token
-                            yield {'type': 'token', 'content': token, 'index': index}
-                            index += 1
-                yield {'type': 'done', 'content': accumulated, 'usage': usage}
+        client = self.client
+        async with client.stream(
+            "POST",
+            url,
+            headers={
+                "api-key": self.api_key,
+                "Content-Type": "application/json",
+            },
+            json={
+                "messages": [{"role": m.role, "content": m.content} for m in messages],
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True,
+                "stream_options": {"include_usage": True},
+            },
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            usage = {}
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if not line or line.startswith(":"):
+                    continue
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if chunk.get("usage"):
+                    usage = {
+                        "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
+                        "completion_tokens": chunk["usage"].get("completion_tokens", 0),
+                    }
+                choices = chunk.get("choices", [])
+                if choices:
+                    token = choices[0].get("delta", {}).get("content", "")
+                    if token:
+                        accumulated += token
+                        yield {'type': 'token', 'content': token, 'index': index}
+                        index += 1
+            yield {'type': 'done', 'content': accumulated, 'usage': usage}
 
     async def health(self) -> bool:
         """Check if endpoint is reachable with the given key"""
         if not self.api_key or not self.endpoint:
             return False
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                r = await client.get(
-                    f"{self.endpoint}/openai/models?api-version={self.api_version}",
-                    headers={"api-key": self.api_key},
-                )
-                return r.status_code < 400
+            client = self.client
+            r = await client.get(
+                f"{self.endpoint}/openai/models?api-version={self.api_version}",
+                headers={"api-key": self.api_key},
+                timeout=10.0,
+            )
+            return r.status_code < 400
         except Exception:
             return False
 
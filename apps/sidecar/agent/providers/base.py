@@ -4,11 +4,19 @@ Base Provider Interface
 Abstract base class for all LLM providers.
 """
 
+import asyncio
+import importlib.util
 from abc import ABC, abstractmethod
-from typing import AsyncGenerator, Optional, Any
+from typing import AsyncGenerator, AsyncIterator, Optional, Any
+
+import httpx
 from pydantic import BaseModel
 
 
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
 class Message(BaseModel):
     """A single message in a conversation"""
     role: str  # "user" | "assistant" | "system" | "tool"
@@ -26,6 +34,31 @@ class ChatResponse(BaseModel):
     raw_content: Optional[list[dict]] = None  # Raw content blocks (for multi-turn tool use)
 
 
+async def aiter_byte_lines(response: Any) -> AsyncIterator[bytes]:
+    """Yield raw lines from a streaming httpx response without decoding to str.
+
+    Splits on b"\n" with bytes.find, so SSE/NDJSON payloads can be handed to
+    orjson.loads as bytes and UTF-8 decoding happens inside the parser.
+    The receive buffer is a bytearray sliced through a memoryview, so each
+    line is copied exactly once and consumed bytes are dropped in place.
+    """
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        buf += chunk
+        nl = buf.find(b"\n")
+        if nl == -1:
+            continue
+        start = 0
+        with memoryview(buf) as view:
+            while nl != -1:
+                yield bytes(view[start:nl])
+                start = nl + 1
+                nl = buf.find(b"\n", start)
+        del buf[:start]
+    if buf:
+        yield bytes(buf)
+
+
 class AgentProvider(ABC):
     """
     Abstract base class for LLM providers.
@@ -37,6 +70,44 @@ class AgentProvider(ABC):
 
     name: str = "base"
 
+    # Settings for the pooled `client`; providers override as needed.
+    # http2 multiplexes concurrent requests over one TLS connection.
+    timeout: float = 60.0
+    http2: bool = False
+    max_keepalive_connections: int = 32
+    _client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled keep-alive client shared by all calls on this provider.
+
+        Created on first use unless one was injected via the constructor.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self.new_client()
+        return self._client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient):
+        """Use a pooled client owned (and closed) by the caller."""
+        self._client = client
+
+    @property
+    def client_key(self) -> tuple:
+        """Settings new_client() depends on; equal keys can share one client."""
+        return ("provider", self.timeout, self.http2 and HTTP2_AVAILABLE, self.max_keepalive_connections)
+
+    def new_client(self) -> httpx.AsyncClient:
+        """Build a keep-alive client with this provider's settings."""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=self.http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=60.0,
+            ),
+        )
+
     @abstractmethod
     async def chat(
         self,
@@ -61,6 +132,25 @@ class AgentProvider(ABC):
         """
         pass
 
+    async def chat_batch(
+        self,
+        batch: list[list[Message]],
+        model: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+    ) -> list[ChatResponse | BaseException]:
+        """
+        Run several independent conversations with the same settings.
+
+        Override when the backend accepts batched prompts (e.g. vLLM); the
+        default issues the calls concurrently. Failed items are returned as
+        exception instances so one error doesn't sink the whole batch.
+        """
+        return await asyncio.gather(
+            *(self.chat(messages, model, temperature, max_tokens) for messages in batch),
+            return_exceptions=True,
+        )
+
     async def chat_stream(
         self,
         messages: list[Message],
@@ -82,3 +172,9 @@ class AgentProvider(ABC):
     def list_models(self) -> list[str]:
         """List available models for this provider."""
         pass
+
+    async def aclose(self):
+        """Release pooled HTTP connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -21,17 +21,20 @@ class GoogleProvider(AgentProvider):
     """
 
     name = "google"
+    http2 = True
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         default_model: str = "gemini-2.0-flash",
         timeout: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.default_model = default_model
         self.timeout = timeout
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
+        self._client = client
 
     def _convert_messages(self, messages: list[Message]) -> tuple[list[dict], Optional[str]]:
         """Convert messages to Gemini format. Returns (contents, system_instruction)."""
@@ -91,70 +94,70 @@ class GoogleProvider(AgentProvider):
         model = model or self.default_model
         contents, system_instruction = self._convert_messages(messages)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            payload = {
-                "contents": contents,
-                "generationConfig": {
-                    "temperature": temperature,
-                    "maxOutputTokens": max_tokens,
-                }
+        client = self.client
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
             }
+        }
 
-            if system_instruction:
-                payload["systemInstruction"] = {
-                    "parts": [{"text": system_instruction}]
-                }
-
-            if tools:
-                payload["tools"] = [{"functionDeclarations": tools}]
+        if system_instruction:
+            payload["systemInstruction"] = {
+                "parts": [{"text": system_instruction}]
+            }
 
-            response = await client.post(
-                f"{self.base_url}/models/{model}:generateContent",
-                params={"key": self.api_key},
-                headers={"Content-Type": "application/json"},
-                json=payload,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            # Parse response
-            candidate = data["candidates"][0]
-            parts = candidate["content"]["parts"]
-            finish_reason = candidate.get("finishReason", "STOP")
-
-            text_parts = []
-            tool_calls = []
-            raw_parts = []
-
-            for part in parts:
-                if "text" in part:
-                    text_parts.append(part["text"])
-                elif "functionCall" in part:
-                    fc = part["functionCall"]
-                    tool_calls.append({
-                        "id": fc["name"],  # Gemini doesn't have separate IDs
-                        "name": fc["name"],
-                        "input": fc.get("args", {}),
-                    })
-                raw_parts.append(part)
+        if tools:
+            payload["tools"] = [{"functionDeclarations": tools}]
+
+        response = await client.post(
+            f"{self.base_url}/models/{model}:generateContent",
+            params={"key": self.api_key},
+            headers={"Content-Type": "application/json"},
+            json=payload,
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Parse response
+        candidate = data["candidates"][0]
+        parts = candidate["content"]["parts"]
+        finish_reason = candidate.get("finishReason", "STOP")
+
+        text_parts = []
+        tool_calls = []
+        raw_parts = []
+
+        for part in parts:
+            if "text" in part:
+                text_parts.append(part["text"])
+            elif "functionCall" in part:
+                fc = part["functionCall"]
+                tool_calls.append({
+                    "id": fc["name"],  # Gemini doesn't have separate IDs
+                    "name": fc["name"],
+                    "input": fc.get("args", {}),
+                })
+            raw_parts.append(part)
+
+        # Usage metadata
+        usage = {}
+        if "usageMetadata" in data:
+            usage = {
+                "prompt_tokens": data["usageMetadata"].get("promptTokenCount", 0),
+                "completion_tokens": data["usageMetadata"].get("candidatesTokenCount", 0),
+            }
 
-            # Usage metadata
-            usage = {}
-            if "usageMetadata" in data:
-                usage = {
-                    "prompt_tokens": data["usageMetadata"].get("promptTokenCount", 0),
-                    "completion_tokens": data["usageMetadata"].get("candidatesTokenCount", 0),
-                }
-
-            return ChatResponse(
-                content="\n".join(text_parts) if text_parts else "",
-                model=model,
-                provider=self.name,
-                usage=usage,
-                tool_calls=tool_calls if tool_calls else None,
-                stop_reason="tool_use" if tool_calls else finish_reason,
-                raw_content=raw_parts if tool_calls else None,
-            )
+        return ChatResponse(
+            content="\n".join(text_parts) if text_parts else "",
+            model=model,
+            provider=self.name,
+            usage=usage,
+            tool_calls=tool_calls if tool_calls else None,
+            stop_reason="tool_use" if tool_calls else finish_reason,
+            raw_content=raw_parts if tool_calls else None,
+        )
 
     async def chat_stream(
         self,
@@ -180,53 +183,54 @@ class GoogleProvider(AgentProvider):
         if system_instruction:
             payload["systemInstruction"] = {"parts": [{"text": system_instruction}]}
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/models/{model}:streamGenerateContent",
-                params={"key": self.api_key, "alt": "sse"},
-                headers={"Content-Type": "application/json"},
-                json=payload,
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                usage = {}
-                async for line in response.aiter_lines():
-                    line = line.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data: "):
-                        continue
-                    chunk = json.loads(line[6:])
-                    # Extract usage from any chunk that has it
-                    if "usageMetadata" in chunk:
-                        usage = {
-                            "prompt_tokens": chunk["usageMetadata"].get("promptTokenCount", 0),
-                            "completion_tokens": chunk["usageMetadata"].get("candidatesTokenCount", 0),
-                        }
-                    candidates = chunk.get("candidates", [])
-                    if candidates:
-                        parts = candidates[0].get("content", {}).get("parts", [])
-                        for part in parts:
-                            token = part.get("text", "")
-                            if token:
-                                accumulated += token
-                                yield {'type': 'token', 'content': token, 'index': index}
-                                index += 1
-                yield {'type': 'done', 'content': accumulated, 'usage': usage}
+        client = self.client
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/models/{model}:streamGenerateContent",
+            params={"key": self.api_key, "alt": "sse"},
+            headers={"Content-Type": "application/json"},
+            json=payload,
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            usage = {}
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if not line or line.startswith(":"):
+                    continue
+                if not line.startswith("data: "):
+                    continue
+                chunk = json.loads(line[6:])
+                # Extract usage from any chunk that has it
+                if "usageMetadata" in chunk:
+                    usage = {
+                        "prompt_tokens": chunk["usageMetadata"].get("promptTokenCount", 0),
+                        "completion_tokens": chunk["usageMetadata"].get("candidatesTokenCount", 0),
+                    }
+                candidates = chunk.get("candidates", [])
+                if candidates:
+                    parts = candidates[0].get("content", {}).get("parts", [])
+                    for part in parts:
+                        token = part.get("text", "")
+                        if token:
+                            accumulated += token
+                            yield {'type': 'token', 'content': token, 'index': index}
+                            index += 1
+            yield {'type': 'done', 'content': accumulated, 'usage': usage}
 
     async def health(self) -> bool:
         """Check if API key is valid by listing models"""
         if not self.api_key:
             return False
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                r = await client.get(
-                    f"{self.base_url}/models",
-                    params={"key": self.api_key},
-                )
-                return r.status_code == 200
+            client = self.client
+            r = await client.get(
+                f"{self.base_url}/models",
+                params={"key": self.api_key},
+                timeout=10.0,
+            )
+            return r.status_code == 200
         except Exception:
             return False
 
@@ -26,11 +26,13 @@ class LocalOpenAIProvider(AgentProvider):
         api_key: str = "",
         model_name: str = "llama3.2",
         timeout: float = 120.0,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.model_name = model_name
         self.timeout = timeout
+        self._client = client
         print(f"[local] LocalOpenAIProvider init: base_url={self.base_url}, model={self.model_name}")
 
     async def chat(
@@ -58,30 +60,30 @@ class LocalOpenAIProvider(AgentProvider):
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            usage = data.get("usage", {})
-            return ChatResponse(
-                content=data["choices"][0]["message"]["content"],
-                model=model,
-                provider=self.name,
-                usage={
-                    "prompt_tokens": usage.get("prompt_tokens", 0),
-                    "completion_tokens": usage.get("completion_tokens", 0),
-                },
-            )
+        client = self.client
+        response = await client.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": [{"role": m.role, "content": m.content} for m in messages],
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        usage = data.get("usage", {})
+        return ChatResponse(
+            content=data["choices"][0]["message"]["content"],
+            model=model,
+            provider=self.name,
+            usage={
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+            },
+        )
 
     async def chat_stream(
         self,
@@ -99,63 +101,63 @@ class LocalOpenAIProvider(AgentProvider):
         if self.api_key:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "stream": True,
-                },
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                usage = {}
-                async for line in response.aiter_lines():
-                    line = line.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data: "):
-                        continue
-                    data = line[6:]
-                    if data == "[DONE]":
-                        break
-                    chunk = json.loads(data)
-                    # Some servers include usage in the last chunk
-                    if chunk.get("usage"):
-                        usage = {
-                            "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
-                            "completion_tokens": chunk["usage"].get("completion_tokens", 0),
-                        }
-                    choices = chunk.get("choices", [])
-                    if choices:
-                        token = choices[0].get("delta", {}).get("content", "")
-                        if token:
-                            accumulated += token
-                            yield {'type': 'token', 'content': token, 'index': index}
-                            index += 1
-                yield {'type': 'done', 'content': accumulated, 'usage': usage}
+        client = self.client
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": [{"role": m.role, "content": m.content} for m in messages],
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stream": True,
+            },
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            usage = {}
+            async for line in response.aiter_lines():
+                line = line.strip()
+                if not line or line.startswith(":"):
+                    continue
+                if not line.startswith("data: "):
+                    continue
+                data = line[6:]
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                # Some servers include usage in the last chunk
+                if chunk.get("usage"):
+                    usage = {
+                        "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
+                        "completion_tokens": chunk["usage"].get("completion_tokens", 0),
+                    }
+                choices = chunk.get("choices", [])
+                if choices:
+                    token = choices[0].get("delta", {}).get("content", "")
+                    if token:
+                        accumulated += token
+                        yield {'type': 'token', 'content': token, 'index': index}
+                        index += 1
+            yield {'type': 'done', 'content': accumulated, 'usage': usage}
 
     async def health(self) -> bool:
         """Check if server is reachable"""
         if not self.base_url:
             return False
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                # Try /health first, fall back to /v1/models
-                for path in ["/health", "/v1/models", "/models"]:
-                    try:
-                        url = self.base_url.replace("/v1", "") + path
-                        r = await client.get(url)
-                        if r.status_code < 500:
-                            return True
-                    except httpx.ConnectError:
-                        continue
+            client = self.client
+            # Try /health first, fall back to /v1/models
+            for path in ["/health", "/v1/models", "/models"]:
+                try:
+                    url = self.base_url.replace("/v1", "") + path
+                    r = await client.get(url, timeout=5.0)
+                    if r.status_code < 500:
+                        return True
+                except httpx.ConnectError:
+                    continue
         except Exception:
             pass
         return False
@@ -5,10 +5,25 @@ Local LLM provider using Ollama.
 Runs on your local machine with GPU acceleration.
 """
 
-import json
+import os
 import httpx
+import orjson
+from functools import lru_cache
 from typing import AsyncGenerator, Optional
-from .base import AgentProvider, Message, ChatResponse
+from .base import AgentProvider, Message, ChatResponse, aiter_byte_lines
+
+
+@lru_cache(maxsize=64)
+def _base_body(model: str, temperature: float, max_tokens: int, stream: bool) -> dict:
+    """Static (non-message) part of an /api/chat body. Shared — never mutate."""
+    return {
+        "model": model,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        },
+    }
 
 
 class OllamaProvider(AgentProvider):
@@ -27,10 +42,17 @@ class OllamaProvider(AgentProvider):
         base_url: str = "http://localhost:11434",
         default_model: str = "llama3.2",
         timeout: float = 120.0,
+        num_parallel: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.base_url = base_url.rstrip("/")
         self.default_model = default_model
         self.timeout = timeout
+        # Match the server's OLLAMA_NUM_PARALLEL so that many requests can be
+        # in flight on warm connections at once
+        self.num_parallel = num_parallel or int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+        self.max_keepalive_connections = self.num_parallel
+        self._client = client
 
     def _convert_messages(self, messages: list[Message]) -> list[dict]:
         """Convert messages to Ollama format, extracting images for vision."""
@@ -69,31 +91,28 @@ class OllamaProvider(AgentProvider):
         model = model or self.default_model
         ollama_messages = self._convert_messages(messages)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": ollama_messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                    },
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return ChatResponse(
-                content=data["message"]["content"],
-                model=model,
-                provider=self.name,
-                usage={
-                    "prompt_tokens": data.get("prompt_eval_count", 0),
-                    "completion_tokens": data.get("eval_count", 0),
-                },
-            )
+        body = orjson.dumps({
+            **_base_body(model, temperature, max_tokens, False),
+            "messages": ollama_messages,
+        })
+
+        response = await self.client.post(
+            f"{self.base_url}/api/chat",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        return ChatResponse(
+            content=data["message"]["content"],
+            model=model,
+            provider=self.name,
+            usage={
+                "prompt_tokens": data.get("prompt_eval_count", 0),
+                "completion_tokens": data.get("eval_count", 0),
+            },
+        )
 
     async def chat_stream(
         self,
@@ -106,49 +125,45 @@ class OllamaProvider(AgentProvider):
         model = model or self.default_model
         ollama_messages = self._convert_messages(messages)
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": ollama_messages,
-                    "stream": True,
-                    "options": {
-                        "temperature": temperature,
-                        "num_predict": max_tokens,
-                    },
-                },
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                async for line in response.aiter_lines():
-                    if not line.strip():
-                        continue
-                    chunk = json.loads(line)
-                    if chunk.get("done"):
-                        yield {
-                            'type': 'done',
-                            'content': accumulated,
-                            'usage': {
-                                'prompt_tokens': chunk.get('prompt_eval_count', 0),
-                                'completion_tokens': chunk.get('eval_count', 0),
-                            },
-                        }
-                        return
-                    token = chunk.get("message", {}).get("content", "")
-                    if token:
-                        accumulated += token
-                        yield {'type': 'token', 'content': token, 'index': index}
-                        index += 1
+        body = orjson.dumps({
+            **_base_body(model, temperature, max_tokens, True),
+            "messages": ollama_messages,
+        })
+
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            async for line in aiter_byte_lines(response):
+                if not line.strip():
+                    continue
+                chunk = orjson.loads(line)
+                if chunk.get("done"):
+                    yield {
+                        'type': 'done',
+                        'content': accumulated,
+                        'usage': {
+                            'prompt_tokens': chunk.get('prompt_eval_count', 0),
+                            'completion_tokens': chunk.get('eval_count', 0),
+                        },
+                    }
+                    return
+                token = chunk.get("message", {}).get("content", "")
+                if token:
+                    accumulated += token
+                    yield {'type': 'token', 'content': token, 'index': index}
+                    index += 1
 
     async def health(self) -> bool:
         """Check if Ollama is running"""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/tags")
-                return response.status_code == 200
+            response = await self.client.get(f"{self.base_url}/api/tags", timeout=5.0)
+            return response.status_code == 200
         except Exception:
             return False
 
@@ -168,11 +183,12 @@ class OllamaProvider(AgentProvider):
     async def pull_model(self, model: str) -> bool:
         """Pull a model from Ollama registry"""
         try:
-            async with httpx.AsyncClient(timeout=600.0) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/pull",
-                    json={"name": model, "stream": False},
-                )
-                return response.status_code == 200
+            response = await self.client.post(
+                f"{self.base_url}/api/pull",
+                content=orjson.dumps({"name": model, "stream": False}),
+                headers={"Content-Type": "application/json"},
+                timeout=600.0,
+            )
+            return response.status_code == 200
         except Exception:
             return False
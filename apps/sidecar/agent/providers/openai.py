@@ -4,11 +4,26 @@ OpenAI Provider
 Cloud LLM provider using OpenAI's API.
 """
 
-import json
 import os
 import httpx
+import orjson
+from functools import lru_cache
 from typing import AsyncGenerator, Optional
-from .base import AgentProvider, Message, ChatResponse
+from .base import AgentProvider, Message, ChatResponse, aiter_byte_lines
+
+
+@lru_cache(maxsize=64)
+def _base_body(model: str, temperature: float, max_tokens: int, stream: bool) -> dict:
+    """Static (non-message) part of a chat completion body. Shared — never mutate."""
+    body = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+    }
+    if stream:
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+    return body
 
 
 class OpenAIProvider(AgentProvider):
@@ -19,17 +34,20 @@ class OpenAIProvider(AgentProvider):
     """
     
     name = "openai"
+    http2 = True
     
     def __init__(
         self,
         api_key: Optional[str] = None,
         default_model: str = "gpt-4o",
         timeout: float = 60.0,
+        client: Optional[httpx.AsyncClient] = None,
     ):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.default_model = default_model
         self.timeout = timeout
         self.base_url = "https://api.openai.com"
+        self._client = client
     
     async def chat(
         self,
@@ -45,32 +63,32 @@ class OpenAIProvider(AgentProvider):
         
         model = model or self.default_model
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": model,
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+        body = orjson.dumps({
+            **_base_body(model, temperature, max_tokens, False),
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+        })
+
+        client = self.client
+        response = await client.post(
+            f"{self.base_url}/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            content=body,
+        )
+        response.raise_for_status()
+        data = response.json()
             
-            return ChatResponse(
-                content=data["choices"][0]["message"]["content"],
-                model=model,
-                provider=self.name,
-                usage={
-                    "prompt_tokens": data["usage"]["prompt_tokens"],
-                    "completion_tokens": data["usage"]["completion_tokens"],
-                },
-            )
+        return ChatResponse(
+            content=data["choices"][0]["message"]["content"],
+            model=model,
+            provider=self.name,
+            usage={
+                "prompt_tokens": data["usage"]["prompt_tokens"],
+                "completion_tokens": data["usage"]["completion_tokens"],
+            },
+        )
     
     async def chat_stream(
         self,
@@ -85,50 +103,47 @@ class OpenAIProvider(AgentProvider):
 
         model = model or self.default_model
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{self.base_url}/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": model,
-                    "messages": [{"role": m.role, "content": m.content} for m in messages],
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "stream": True,
-                    "stream_options": {"include_usage": True},
-                },
-            ) as response:
-                response.raise_for_status()
-                accumulated = ""
-                index = 0
-                usage = {}
-                async for line in response.aiter_lines():
-                    line = line.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data: "):
-                        continue
-                    data = line[6:]
-                    if data == "[DONE]":
-                        break
-                    chunk = json.loads(data)
-                    if chunk.get("usage"):
-                        usage = {
-                            "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
-                            "completion_tokens": chunk["usage"].get("completion_tokens", 0),
-                        }
-                    choices = chunk.get("choices", [])
-                    if choices:
-                        token = choices[0].get("delta", {}).get("content", "")
-                        if token:
-                            accumulated += token
-                            yield {'type': 'token', 'content': token, 'index': index}
-                            index += 1
-                yield {'type': 'done', 'content': accumulated, 'usage': usage}
+        body = orjson.dumps({
+            **_base_body(model, temperature, max_tokens, True),
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+        })
+
+        client = self.client
+        async with client.stream(
+            "POST",
+            f"{self.base_url}/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            content=body,
+        ) as response:
+            response.raise_for_status()
+            accumulated = ""
+            index = 0
+            usage = {}
+            async for line in aiter_byte_lines(response):
+                line = line.strip()
+                # Skips blank keep-alives and ":" comments as well
+                if not line.startswith(b"data: "):
+                    continue
+                data = memoryview(line)[6:]  # orjson parses the view without a copy
+                if data == b"[DONE]":
+                    break
+                chunk = orjson.loads(data)
+                if chunk.get("usage"):
+                    usage = {
+                        "prompt_tokens": chunk["usage"].get("prompt_tokens", 0),
+                        "completion_tokens": chunk["usage"].get("completion_tokens", 0),
+                    }
+                choices = chunk.get("choices", [])
+                if choices:
+                    token = choices[0].get("delta", {}).get("content", "")
+                    if token:
+                        accumulated += token
+                        yield {'type': 'token', 'content': token, 'index': index}
+                        index += 1
+            yield {'type': 'done', 'content': accumulated, 'usage': usage}
 
     async def health(self) -> bool:
         """Check if API key is valid (lightweight check)"""
@@ -7,7 +7,7 @@ Navigate, screenshot, fill forms, extract data.
 
 import asyncio
 import base64
-from typing import Optional, Any
+from typing import Optional, Any, Literal
 from dataclasses import dataclass, field
 
 
@@ -18,6 +18,7 @@ class BrowserResult:
     action: str
     data: Any = None
     screenshot: Optional[str] = None  # Base64 encoded
+    screenshot_mime: Optional[str] = None  # "image/jpeg" | "image/png"
     error: Optional[str] = None
 
 
@@ -46,18 +47,31 @@ class BrowserTool:
         self._playwright = None
         self._browser = None
         self._page = None
+        # Set once a page is ready; lets callers wait out a background start
+        self.ready = asyncio.Event()
+        self._start_lock = asyncio.Lock()
+    
+    @property
+    def starting(self) -> bool:
+        """True while a start() call is launching the browser"""
+        return self._start_lock.locked()
     
     async def start(self) -> BrowserResult:
-        """Start the browser"""
+        """Start the browser (a no-op if it is already running)"""
         try:
-            from playwright.async_api import async_playwright
-            
-            self._playwright = await async_playwright().start()
-            self._browser = await self._playwright.chromium.launch(
-                headless=self.headless,
-            )
-            self._page = await self._browser.new_page()
-            self._page.set_default_timeout(self.timeout)
+            async with self._start_lock:
+                if self._page:
+                    return BrowserResult(success=True, action="start")
+                
+                from playwright.async_api import async_playwright
+                
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless,
+                )
+                self._page = await self._browser.new_page()
+                self._page.set_default_timeout(self.timeout)
+                self.ready.set()
             
             return BrowserResult(success=True, action="start")
         
@@ -72,6 +86,7 @@ class BrowserTool:
     
     async def stop(self) -> BrowserResult:
         """Stop the browser"""
+        self.ready.clear()
         try:
             if self._browser:
                 await self._browser.close()
@@ -86,13 +101,22 @@ class BrowserTool:
         except Exception as e:
             return BrowserResult(success=False, action="stop", error=str(e))
     
-    async def navigate(self, url: str) -> BrowserResult:
-        """Navigate to a URL"""
+    async def navigate(
+        self,
+        url: str,
+        wait_until: Literal["commit", "domcontentloaded", "load", "networkidle"] = "commit",
+    ) -> BrowserResult:
+        """Navigate to a URL.
+
+        Returns as soon as the main frame commits rather than waiting for the
+        DOM to finish parsing. Callers that need specific content should follow
+        up with wait_for(selector), or pass wait_until="domcontentloaded".
+        """
         if not self._page:
             return BrowserResult(success=False, action="navigate", error="Browser not started")
         
         try:
-            await self._page.goto(url, wait_until="domcontentloaded")
+            await self._page.goto(url, wait_until=wait_until)
             return BrowserResult(
                 success=True,
                 action="navigate",
@@ -101,19 +125,35 @@ class BrowserTool:
         except Exception as e:
             return BrowserResult(success=False, action="navigate", error=str(e))
     
-    async def screenshot(self, full_page: bool = False) -> BrowserResult:
-        """Take a screenshot"""
+    async def screenshot(
+        self,
+        full_page: bool = False,
+        format: Literal["png", "jpeg"] = "jpeg",
+        quality: int = 70,
+    ) -> BrowserResult:
+        """Take a screenshot.
+
+        Defaults to a quality-70 JPEG: several times smaller than PNG, which
+        shrinks the base64 payload and the image-token count for vision LLMs.
+        Pass format="png" for a lossless capture.
+        """
         if not self._page:
             return BrowserResult(success=False, action="screenshot", error="Browser not started")
         
         try:
-            screenshot_bytes = await self._page.screenshot(full_page=full_page)
+            if format == "jpeg":
+                screenshot_bytes = await self._page.screenshot(
+                    full_page=full_page, type="jpeg", quality=quality,
+                )
+            else:
+                screenshot_bytes = await self._page.screenshot(full_page=full_page, type="png")
             screenshot_b64 = base64.b64encode(screenshot_bytes).decode("utf-8")
             
             return BrowserResult(
                 success=True,
                 action="screenshot",
                 screenshot=screenshot_b64,
+                screenshot_mime=f"image/{format}",
             )
         except Exception as e:
             return BrowserResult(success=False, action="screenshot", error=str(e))
@@ -174,6 +214,25 @@ class BrowserTool:
         except Exception as e:
             return BrowserResult(success=False, action="get_html", error=str(e))
     
+    async def extract(self, selector: str = "body") -> BrowserResult:
+        """Extract text and HTML of matching elements in a single round-trip"""
+        if not self._page:
+            return BrowserResult(success=False, action="extract", error="Browser not started")
+        
+        try:
+            elements = await self._page.evaluate(
+                "(s) => Array.from(document.querySelectorAll(s), "
+                "e => ({text: e.innerText.trim(), html: e.innerHTML}))",
+                selector,
+            )
+            return BrowserResult(
+                success=True,
+                action="extract",
+                data={"selector": selector, "elements": elements},
+            )
+        except Exception as e:
+            return BrowserResult(success=False, action="extract", error=str(e))
+    
     async def evaluate(self, script: str) -> BrowserResult:
         """Execute JavaScript in the page"""
         if not self._page:
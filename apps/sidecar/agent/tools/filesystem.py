@@ -5,6 +5,10 @@ File and directory operations with safety controls.
 """
 
 import os
+import json
+import asyncio
+import stat
+import errno
 import shutil
 from pathlib import Path
 from typing import Optional, Union
@@ -38,11 +42,11 @@ class FilesystemTool:
     """
     
     # Paths blocked in restricted mode
-    SENSITIVE_PATHS = [
+    SENSITIVE_PATHS = (
         "/etc", "/usr", "/bin", "/sbin", "/boot", "/sys", "/proc",
         "~/.ssh", "~/.gnupg", "~/.aws", "~/.config/gcloud",
         "/var/log", "/var/lib",
-    ]
+    )
     
     def __init__(
         self,
@@ -53,17 +57,41 @@ class FilesystemTool:
         self.mode = mode
         self.workspace = Path(workspace or os.getcwd()).resolve()
         self.max_file_size = max_file_size
+        self._workspace_real = str(self.workspace)
+        # Expanded once; str.startswith(tuple) checks them all in one C call
+        self._sensitive_expanded = tuple(os.path.expanduser(p) for p in self.SENSITIVE_PATHS)
     
     def _resolve_path(self, path: str) -> Path:
         """Resolve path relative to workspace"""
+        if self.mode == "full":
+            # No access checks follow, so skip the per-component readlink walk;
+            # the other modes need symlinks resolved before checking the path
+            return Path(os.path.normpath(os.path.join(self._workspace_real, path)))
+        # Resolved fresh on every call: a cached result would go stale when a
+        # path is swapped for a symlink (by the shell tool, a copy, or anything
+        # outside the sidecar) and let reads escape the checked area
         p = Path(path)
         if not p.is_absolute():
             p = self.workspace / p
         return p.resolve()
     
-    def _is_allowed(self, path: Path) -> tuple[bool, str]:
-        """Check if path is allowed"""
-        path_str = str(path)
+    def _is_allowed(self, path_str: str) -> tuple[bool, str]:
+        """
+        Check if path is allowed.
+        
+        Purely lexical: callers pass the already-resolved path, so no
+        further filesystem access is needed here.
+        """
+        # Restricted is the default mode, so check it first
+        if self.mode == "restricted":
+            path_str = os.path.normpath(path_str)
+            if path_str.startswith(self._sensitive_expanded):
+                sensitive = next(
+                    p for p, expanded in zip(self.SENSITIVE_PATHS, self._sensitive_expanded)
+                    if path_str.startswith(expanded)
+                )
+                return False, f"Access to '{sensitive}' is blocked"
+            return True, ""
         
         if self.mode == "full":
             return True, ""
@@ -71,49 +99,74 @@ class FilesystemTool:
         # In sandboxed mode, must be within workspace
         if self.mode == "sandboxed":
             try:
-                path.relative_to(self.workspace)
-                return True, ""
+                if os.path.commonpath((self._workspace_real, os.path.normpath(path_str))) == self._workspace_real:
+                    return True, ""
             except ValueError:
-                return False, f"Path '{path}' is outside workspace"
-        
-        # In restricted mode, block sensitive paths
-        if self.mode == "restricted":
-            for sensitive in self.SENSITIVE_PATHS:
-                expanded = os.path.expanduser(sensitive)
-                if path_str.startswith(expanded):
-                    return False, f"Access to '{sensitive}' is blocked"
+                pass
+            return False, f"Path '{path_str}' is outside workspace"
         
         return True, ""
     
-    def read(self, path: str, encoding: str = "utf-8") -> FileResult:
+    def _read_sync(self, path: str, encoding: str = "utf-8") -> FileResult:
         """Read file contents"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="read", path=str(resolved), error=reason)
         
         try:
-            if not resolved.exists():
+            try:
+                fd = os.open(resolved, os.O_RDONLY)
+            except FileNotFoundError:
                 return FileResult(success=False, action="read", path=str(resolved), error="File not found")
             
-            if resolved.stat().st_size > self.max_file_size:
-                return FileResult(
-                    success=False, action="read", path=str(resolved),
-                    error=f"File too large (max {self.max_file_size} bytes)"
-                )
+            try:
+                size = os.fstat(fd).st_size
+                if size > self.max_file_size:
+                    return FileResult(
+                        success=False, action="read", path=str(resolved),
+                        error=f"File too large (max {self.max_file_size} bytes)"
+                    )
+                
+                # Read straight into a preallocated buffer and decode once.
+                # st_size is only a hint: /proc files report 0 and a file can
+                # grow after fstat, so read until EOF and grow as needed
+                buf = bytearray(size + 1)
+                n = 0
+                while True:
+                    if n == len(buf):
+                        if n > self.max_file_size:
+                            return FileResult(
+                                success=False, action="read", path=str(resolved),
+                                error=f"File too large (max {self.max_file_size} bytes)"
+                            )
+                        buf.extend(bytes(max(n, 64 * 1024)))
+                    with memoryview(buf) as view:
+                        got = os.readv(fd, [view[n:]])
+                    if got == 0:
+                        break
+                    n += got
+                if n > self.max_file_size:
+                    return FileResult(
+                        success=False, action="read", path=str(resolved),
+                        error=f"File too large (max {self.max_file_size} bytes)"
+                    )
+                del buf[n:]
+            finally:
+                os.close(fd)
             
-            content = resolved.read_text(encoding=encoding)
+            content = buf.decode(encoding)
             return FileResult(success=True, action="read", path=str(resolved), data=content)
         
         except Exception as e:
             return FileResult(success=False, action="read", path=str(resolved), error=str(e))
     
-    def write(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
+    def _write_sync(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
         """Write content to file"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="write", path=str(resolved), error=reason)
         
@@ -126,11 +179,11 @@ class FilesystemTool:
         except Exception as e:
             return FileResult(success=False, action="write", path=str(resolved), error=str(e))
     
-    def append(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
+    def _append_sync(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
         """Append content to file"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="append", path=str(resolved), error=reason)
         
@@ -143,20 +196,28 @@ class FilesystemTool:
         except Exception as e:
             return FileResult(success=False, action="append", path=str(resolved), error=str(e))
     
-    def delete(self, path: str) -> FileResult:
+    def _delete_sync(self, path: str) -> FileResult:
         """Delete file or directory"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="delete", path=str(resolved), error=reason)
         
         try:
-            if not resolved.exists():
+            try:
+                st = resolved.stat()
+            except FileNotFoundError:
                 return FileResult(success=False, action="delete", path=str(resolved), error="Path not found")
             
-            if resolved.is_dir():
-                shutil.rmtree(resolved)
+            if stat.S_ISDIR(st.st_mode):
+                # Empty directories go in one syscall; only walk the tree when needed
+                try:
+                    resolved.rmdir()
+                except OSError as e:
+                    if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                        raise
+                    shutil.rmtree(resolved)
             else:
                 resolved.unlink()
             
@@ -165,47 +226,53 @@ class FilesystemTool:
         except Exception as e:
             return FileResult(success=False, action="delete", path=str(resolved), error=str(e))
     
-    def list_dir(self, path: str = ".", include_hidden: bool = False) -> FileResult:
+    def _list_dir_sync(self, path: str = ".", include_hidden: bool = False) -> FileResult:
         """List directory contents"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="list_dir", path=str(resolved), error=reason)
         
         try:
-            if not resolved.exists():
+            # scandir's DirEntry carries the file type from the directory read,
+            # so only regular files need a stat() (for their size)
+            try:
+                with os.scandir(resolved) as it:
+                    if include_hidden:
+                        visible = list(it)
+                    else:
+                        visible = [e for e in it if e.name[0] != "."]
+            except FileNotFoundError:
                 return FileResult(success=False, action="list_dir", path=str(resolved), error="Directory not found")
-            
-            if not resolved.is_dir():
+            except NotADirectoryError:
                 return FileResult(success=False, action="list_dir", path=str(resolved), error="Not a directory")
+            visible.sort(key=lambda e: e.name)
             
             entries = []
-            for entry in sorted(resolved.iterdir()):
-                if not include_hidden and entry.name.startswith("."):
-                    continue
-                
+            for entry in visible:
+                is_dir = entry.is_dir()
                 entries.append({
                     "name": entry.name,
-                    "type": "directory" if entry.is_dir() else "file",
-                    "size": entry.stat().st_size if entry.is_file() else None,
+                    "type": "directory" if is_dir else "file",
+                    "size": entry.stat().st_size if not is_dir and entry.is_file() else None,
                 })
             
             return FileResult(
                 success=True,
                 action="list_dir",
                 path=str(resolved),
-                data=str(entries),  # JSON would be better
+                data=json.dumps(entries, separators=(",", ":")),
             )
         
         except Exception as e:
             return FileResult(success=False, action="list_dir", path=str(resolved), error=str(e))
     
-    def mkdir(self, path: str) -> FileResult:
+    def _mkdir_sync(self, path: str) -> FileResult:
         """Create directory"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="mkdir", path=str(resolved), error=reason)
         
@@ -216,11 +283,11 @@ class FilesystemTool:
         except Exception as e:
             return FileResult(success=False, action="mkdir", path=str(resolved), error=str(e))
     
-    def exists(self, path: str) -> FileResult:
+    def _exists_sync(self, path: str) -> FileResult:
         """Check if path exists"""
         resolved = self._resolve_path(path)
         
-        allowed, reason = self._is_allowed(resolved)
+        allowed, reason = self._is_allowed(str(resolved))
         if not allowed:
             return FileResult(success=False, action="exists", path=str(resolved), error=reason)
         
@@ -232,13 +299,13 @@ class FilesystemTool:
             data=str(exists),
         )
     
-    def copy(self, source: str, dest: str) -> FileResult:
+    def _copy_sync(self, source: str, dest: str) -> FileResult:
         """Copy file or directory"""
         src_resolved = self._resolve_path(source)
         dst_resolved = self._resolve_path(dest)
         
         for resolved in [src_resolved, dst_resolved]:
-            allowed, reason = self._is_allowed(resolved)
+            allowed, reason = self._is_allowed(str(resolved))
             if not allowed:
                 return FileResult(success=False, action="copy", path=str(resolved), error=reason)
         
@@ -256,13 +323,13 @@ class FilesystemTool:
         except Exception as e:
             return FileResult(success=False, action="copy", path=str(src_resolved), error=str(e))
     
-    def move(self, source: str, dest: str) -> FileResult:
+    def _move_sync(self, source: str, dest: str) -> FileResult:
         """Move file or directory"""
         src_resolved = self._resolve_path(source)
         dst_resolved = self._resolve_path(dest)
         
         for resolved in [src_resolved, dst_resolved]:
-            allowed, reason = self._is_allowed(resolved)
+            allowed, reason = self._is_allowed(str(resolved))
             if not allowed:
                 return FileResult(success=False, action="move", path=str(resolved), error=reason)
         
@@ -275,3 +342,42 @@ class FilesystemTool:
         
         except Exception as e:
             return FileResult(success=False, action="move", path=str(src_resolved), error=str(e))
+
+    # Async API: the sync bodies run in the default executor so file I/O
+    # never blocks the server's event loop
+
+    async def read(self, path: str, encoding: str = "utf-8") -> FileResult:
+        """Read file contents"""
+        return await asyncio.to_thread(self._read_sync, path, encoding)
+
+    async def write(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
+        """Write content to file"""
+        return await asyncio.to_thread(self._write_sync, path, content, encoding)
+
+    async def append(self, path: str, content: str, encoding: str = "utf-8") -> FileResult:
+        """Append content to file"""
+        return await asyncio.to_thread(self._append_sync, path, content, encoding)
+
+    async def delete(self, path: str) -> FileResult:
+        """Delete file or directory"""
+        return await asyncio.to_thread(self._delete_sync, path)
+
+    async def list_dir(self, path: str = ".", include_hidden: bool = False) -> FileResult:
+        """List directory contents"""
+        return await asyncio.to_thread(self._list_dir_sync, path, include_hidden)
+
+    async def mkdir(self, path: str) -> FileResult:
+        """Create directory"""
+        return await asyncio.to_thread(self._mkdir_sync, path)
+
+    async def exists(self, path: str) -> FileResult:
+        """Check if path exists"""
+        return await asyncio.to_thread(self._exists_sync, path)
+
+    async def copy(self, source: str, dest: str) -> FileResult:
+        """Copy file or directory"""
+        return await asyncio.to_thread(self._copy_sync, source, dest)
+
+    async def move(self, source: str, dest: str) -> FileResult:
+        """Move file or directory"""
+        return await asyncio.to_thread(self._move_sync, source, dest)
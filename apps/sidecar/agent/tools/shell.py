@@ -6,11 +6,76 @@ Execute shell commands with safety controls.
 
 import asyncio
 import os
+import re
 import shlex
-from typing import Optional
+import signal
+import uuid
+from functools import lru_cache
+from typing import Callable, Optional
 from dataclasses import dataclass
 
 
+# How long discarding the persistent shell waits for its pipes and exit
+SHELL_DISCARD_TIMEOUT = 1.0
+
+
+@lru_cache(maxsize=8)
+def _build_pattern_matcher(patterns: tuple[str, ...]) -> Callable[[str], Optional[str]]:
+    """
+    Compile substring patterns into a single-pass matcher.
+
+    Returns a function mapping a command to the first matched pattern (or None).
+    Prefers a Hyperscan database, then an Aho–Corasick automaton (pyahocorasick),
+    then one compiled regex alternation — each a single scan of the command.
+    """
+    try:
+        import hyperscan
+
+        db = hyperscan.Database()
+        db.compile(
+            expressions=[re.escape(p).encode() for p in patterns],
+            ids=list(range(len(patterns))),
+            flags=[hyperscan.HS_FLAG_DOTALL | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+        )
+
+        def find(command: str) -> Optional[str]:
+            matched: list[int] = []
+            db.scan(
+                command.encode("utf-8", errors="surrogateescape"),
+                match_event_handler=lambda id, start, end, flags, ctx: matched.append(id),
+            )
+            return patterns[min(matched)] if matched else None
+
+        return find
+    except ImportError:
+        pass
+
+    try:
+        import ahocorasick
+
+        automaton = ahocorasick.Automaton()
+        for pattern in patterns:
+            automaton.add_word(pattern, pattern)
+        automaton.make_automaton()
+
+        def find(command: str) -> Optional[str]:
+            for _, pattern in automaton.iter(command):
+                return pattern
+            return None
+
+        return find
+    except ImportError:
+        pass
+
+    regex = re.compile("|".join(map(re.escape, patterns)))
+
+    def find(command: str) -> Optional[str]:
+        match = regex.search(command)
+        return match.group(0) if match else None
+
+    return find
+
+
 @dataclass
 class ShellResult:
     """Result of a shell command execution"""
@@ -30,6 +95,12 @@ class ShellTool:
     - restricted: Block dangerous commands (rm -rf, sudo, etc.)
     - full: Allow all commands (use with caution)
     
+    With persistent=True one bash process serves every run() call. Each
+    command runs in a subshell, but background jobs it starts (`cmd &`)
+    keep the shell's stdout/stderr and their output lands in whatever later
+    command is being read at the time. Redirect a background job's output
+    (`cmd >/dev/null 2>&1 &`) or use a one-shot ShellTool for it.
+    
     Example:
         shell = ShellTool(mode="restricted")
         result = await shell.run("ls -la")
@@ -50,12 +121,12 @@ class ShellTool:
     ]
     
     # Commands allowed in sandboxed mode
-    SAFE_COMMANDS = [
+    SAFE_COMMANDS = frozenset({
         "ls", "cat", "head", "tail", "grep", "find", "pwd", "echo",
         "date", "whoami", "uname", "env", "which", "wc", "sort",
         "uniq", "diff", "file", "stat", "du", "df", "ps", "top",
         "curl", "wget", "python", "python3", "node", "npm", "git",
-    ]
+    })
     
     def __init__(
         self,
@@ -63,11 +134,20 @@ class ShellTool:
         timeout: float = 30.0,
         working_dir: Optional[str] = None,
         env: Optional[dict] = None,
+        max_output: int = 4 * 1024 * 1024,  # 4MB per stream
+        persistent: bool = False,  # reuse one bash process across run() calls
     ):
         self.mode = mode
         self.timeout = timeout
+        self.max_output = max_output
+        self.persistent = persistent
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._proc_lock = asyncio.Lock()
         self.working_dir = working_dir or os.getcwd()
-        self.env = {**os.environ, **(env or {})}
+        # None lets the child inherit the live environment without a copy;
+        # only build a merged dict when there are overrides
+        self.env = {**os.environ, **env} if env else None
+        self._find_dangerous = _build_pattern_matcher(tuple(self.DANGEROUS_PATTERNS))
     
     def _is_safe(self, command: str) -> tuple[bool, str]:
         """Check if command is safe to execute"""
@@ -76,19 +156,24 @@ class ShellTool:
         
         # Check for dangerous patterns
         if self.mode in ("restricted", "sandboxed"):
-            for pattern in self.DANGEROUS_PATTERNS:
-                if pattern in command:
-                    return False, f"Blocked dangerous pattern: {pattern}"
+            pattern = self._find_dangerous(command)
+            if pattern is not None:
+                return False, f"Blocked dangerous pattern: {pattern}"
         
         # In sandboxed mode, only allow whitelisted commands
         if self.mode == "sandboxed":
-            try:
-                parts = shlex.split(command)
-                base_cmd = os.path.basename(parts[0]) if parts else ""
-                if base_cmd not in self.SAFE_COMMANDS:
-                    return False, f"Command '{base_cmd}' not in allowed list"
-            except ValueError:
-                return False, "Invalid command syntax"
+            # Only argv[0] matters; whitespace split unless it needs shell unquoting
+            parts = command.split(None, 1)
+            first = parts[0] if parts else ""
+            if '"' in first or "'" in first or "\\" in first:
+                try:
+                    parts = shlex.split(command)
+                except ValueError:
+                    return False, "Invalid command syntax"
+                first = parts[0] if parts else ""
+            base_cmd = os.path.basename(first)
+            if base_cmd not in self.SAFE_COMMANDS:
+                return False, f"Command '{base_cmd}' not in allowed list"
         
         return True, ""
     
@@ -122,6 +207,11 @@ class ShellTool:
         timeout = timeout or self.timeout
         cwd = cwd or self.working_dir
         
+        if self.persistent:
+            result = await self._run_persistent(command, timeout, cwd)
+            if result is not None:
+                return result
+        
         try:
             process = await asyncio.create_subprocess_shell(
                 command,
@@ -129,30 +219,184 @@ class ShellTool:
                 stderr=asyncio.subprocess.PIPE,
                 cwd=cwd,
                 env=self.env,
+                start_new_session=True,
+            )
+        except Exception as e:
+            return ShellResult(
+                command=command,
+                stdout="",
+                stderr=str(e),
+                return_code=-1,
+            )
+        
+        return await self._communicate(command, process, timeout)
+    
+    async def _ensure_shell(self) -> asyncio.subprocess.Process:
+        """Start the persistent bash process if it isn't running"""
+        if self._proc is None or self._proc.returncode is not None:
+            self._proc = await asyncio.create_subprocess_exec(
+                "bash", "--noprofile", "--norc", "-s",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.working_dir,
+                env=self.env,
+                start_new_session=True,
+                limit=self.max_output,
             )
+        return self._proc
+    
+    async def _discard_shell(self) -> None:
+        """Kill the persistent shell; the next call starts a fresh one"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if proc.returncode is None:
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(proc.pid, signal.SIGKILL)
+                else:
+                    proc.kill()
+            except ProcessLookupError:
+                pass
+        # Drain what's left so the pipes reach EOF, but don't wait on them for
+        # long: a background job (e.g. `setsid sleep 60 &`) escapes the process
+        # group, keeps the pipes open and would hold _proc_lock until it exits
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(proc.stdout.read(), proc.stderr.read()),
+                SHELL_DISCARD_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            # No public close on Process; drop our ends of the pipes instead
+            proc._transport.close()
+        try:
+            await asyncio.wait_for(proc.wait(), SHELL_DISCARD_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def _run_persistent(self, command: str, timeout: float, cwd: str) -> Optional[ShellResult]:
+        """
+        Run a command in the persistent shell.
+        
+        Each command runs in a subshell, so cd/exit/variables don't leak
+        between calls, and is followed by a unique marker on both streams.
+        Returns None if the shell couldn't take the command, so the caller
+        can fall back to a one-shot process.
+        """
+        async with self._proc_lock:
+            marker = f"__END_{uuid.uuid4().hex}__"
+            try:
+                proc = await self._ensure_shell()
+                proc.stdin.write(
+                    f"(cd {shlex.quote(cwd)} && eval {shlex.quote(command)}) </dev/null\n"
+                    f"printf '\\n{marker} %d\\n' $?\n"
+                    f"printf '\\n{marker}\\n' >&2\n".encode()
+                )
+                await proc.stdin.drain()
+            except Exception:
+                # Nothing has run yet; let run() spawn this command directly
+                await self._discard_shell()
+                return None
+            
+            end = f"\n{marker}".encode()
+            
+            async def read_stdout():
+                out = await proc.stdout.readuntil(end + b" ")
+                code = int(await proc.stdout.readline())
+                return out[:-len(end) - 1], code
+            
+            async def collect():
+                # Drain both pipes together so a chatty stderr can't stall stdout
+                readers = [
+                    asyncio.ensure_future(read_stdout()),
+                    asyncio.ensure_future(proc.stderr.readuntil(end + b"\n")),
+                ]
+                try:
+                    (out, code), err = await asyncio.gather(*readers)
+                finally:
+                    # If one side failed, stop the other before the pipes are reused
+                    for reader in readers:
+                        reader.cancel()
+                    await asyncio.gather(*readers, return_exceptions=True)
+                return out, err[:-len(end) - 1], code
             
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=timeout,
+                stdout, stderr, code = await asyncio.wait_for(collect(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await self._discard_shell()
+                return ShellResult(
+                    command=command,
+                    stdout="",
+                    stderr=f"Command timed out after {timeout}s",
+                    return_code=-1,
+                    timed_out=True,
                 )
+            except asyncio.LimitOverrunError:
+                await self._discard_shell()
                 return ShellResult(
                     command=command,
-                    stdout=stdout.decode("utf-8", errors="replace"),
-                    stderr=stderr.decode("utf-8", errors="replace"),
-                    return_code=process.returncode or 0,
+                    stdout="",
+                    stderr=f"[output exceeded {self.max_output} bytes, process killed]",
+                    return_code=-1,
                 )
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
+            except Exception as e:
+                await self._discard_shell()
                 return ShellResult(
                     command=command,
                     stdout="",
-                    stderr=f"Command timed out after {timeout}s",
+                    stderr=str(e),
                     return_code=-1,
-                    timed_out=True,
                 )
+            
+            return ShellResult(
+                command=command,
+                stdout=stdout.decode("utf-8", errors="replace"),
+                stderr=stderr.decode("utf-8", errors="replace"),
+                return_code=code,
+            )
+    
+    async def aclose(self) -> None:
+        """Stop the persistent shell, if one is running"""
+        async with self._proc_lock:
+            await self._discard_shell()
+    
+    async def run_script(
+        self,
+        script: str,
+        interpreter: str = "bash",
+        timeout: Optional[float] = None,
+    ) -> ShellResult:
+        """Execute a multi-line script, fed to the interpreter on stdin"""
+        command = f"{interpreter} <script>"
         
+        # The interpreter is what gets executed; the script body is still
+        # screened for blocked patterns
+        is_safe, reason = self._is_safe(interpreter)
+        if is_safe and self.mode != "full":
+            pattern = self._find_dangerous(script)
+            if pattern is not None:
+                is_safe, reason = False, f"Blocked dangerous pattern: {pattern}"
+        if not is_safe:
+            return ShellResult(
+                command=command,
+                stdout="",
+                stderr=f"Command blocked: {reason}",
+                return_code=-1,
+            )
+        
+        timeout = timeout or self.timeout
+        
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *shlex.split(interpreter),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.working_dir,
+                env=self.env,
+                start_new_session=True,
+            )
         except Exception as e:
             return ShellResult(
                 command=command,
@@ -160,22 +404,85 @@ class ShellTool:
                 stderr=str(e),
                 return_code=-1,
             )
+        
+        return await self._communicate(command, process, timeout, script.encode("utf-8"))
     
-    async def run_script(
+    async def _communicate(
         self,
-        script: str,
-        interpreter: str = "bash",
-        timeout: Optional[float] = None,
+        command: str,
+        process: asyncio.subprocess.Process,
+        timeout: float,
+        input: Optional[bytes] = None,
     ) -> ShellResult:
-        """Execute a multi-line script"""
-        import tempfile
+        """Collect output from a spawned process, killing it on timeout or overflow"""
+        limit = self.max_output
         
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".sh", delete=False) as f:
-            f.write(script)
-            script_path = f.name
+        def kill() -> None:
+            # The shell may have forked the command; kill its whole group
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except ProcessLookupError:
+                pass
+        
+        async def feed() -> None:
+            try:
+                process.stdin.write(input)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                process.stdin.close()
+        
+        async def read_bounded(stream: asyncio.StreamReader) -> tuple[bytes, bool]:
+            buf = bytearray()
+            while chunk := await stream.read(64 * 1024):
+                room = limit - len(buf)
+                if len(chunk) > room:
+                    buf += chunk[:room]
+                    kill()
+                    return bytes(buf), True
+                buf += chunk
+            return bytes(buf), False
+        
+        async def collect():
+            readers = [read_bounded(process.stdout), read_bounded(process.stderr)]
+            if input is not None:
+                readers.append(feed())
+            results = await asyncio.gather(*readers)
+            await process.wait()
+            return results[0], results[1]
         
         try:
-            result = await self.run(f"{interpreter} {script_path}", timeout=timeout)
-            return result
-        finally:
-            os.unlink(script_path)
+            (stdout, out_cut), (stderr, err_cut) = await asyncio.wait_for(
+                collect(),
+                timeout=timeout,
+            )
+            stderr_text = stderr.decode("utf-8", errors="replace")
+            if out_cut or err_cut:
+                stderr_text += f"\n[output truncated at {limit} bytes, process killed]"
+            return ShellResult(
+                command=command,
+                stdout=stdout.decode("utf-8", errors="replace"),
+                stderr=stderr_text,
+                return_code=process.returncode or 0,
+            )
+        except asyncio.TimeoutError:
+            kill()
+            await process.wait()
+            return ShellResult(
+                command=command,
+                stdout="",
+                stderr=f"Command timed out after {timeout}s",
+                return_code=-1,
+                timed_out=True,
+            )
+        except Exception as e:
+            return ShellResult(
+                command=command,
+                stdout="",
+                stderr=str(e),
+                return_code=-1,
+            )
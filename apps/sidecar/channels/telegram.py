@@ -11,6 +11,8 @@ Setup:
 """
 
 import os
+import time
+import asyncio
 import logging
 from typing import Optional
 
@@ -34,6 +36,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Telegram's hard limit for a single text message
+MAX_MESSAGE_LENGTH = 4096
+
+# How long /status reuses the last provider health check
+HEALTH_CACHE_TTL = 5.0
+
 
 class TelegramBot:
     """
@@ -56,6 +64,7 @@ class TelegramBot:
         self.chat_service = chat_service or self._create_chat_service()
         self.default_provider = os.getenv("TELEGRAM_PROVIDER", "ollama")
         self.default_model = os.getenv("TELEGRAM_MODEL")
+        self._health_cache: tuple[float, dict] = (0.0, {})
     
     def _create_chat_service(self) -> ChatService:
         """Create and configure chat service"""
@@ -138,7 +147,13 @@ class TelegramBot:
         """Handle /status command"""
         chat_id = str(update.effective_chat.id)
         conv = self.chat_service.get_or_create_conversation(chat_id)
-        health = await self.chat_service.health_check()
+        
+        # Bursts of /status share one round of provider health requests
+        now = time.monotonic()
+        checked_at, health = self._health_cache
+        if not health or now - checked_at > HEALTH_CACHE_TTL:
+            health = await self.chat_service.health_check()
+            self._health_cache = (now, health)
         
         health_status = "\n".join([
             f"• {name}: {'✓' if ok else '✗'}" 
@@ -171,13 +186,11 @@ class TelegramBot:
                 model=self.default_model,
             )
             
-            # Telegram has 4096 char limit, split if needed
+            # Telegram has 4096 char limit, split if needed. Chunks are sent in
+            # order: concurrent sends can land out of order in the chat.
             content = response.content
-            if len(content) > 4000:
-                for i in range(0, len(content), 4000):
-                    await update.message.reply_text(content[i:i+4000])
-            else:
-                await update.message.reply_text(content)
+            for i in range(0, len(content), MAX_MESSAGE_LENGTH):
+                await update.message.reply_text(content[i:i + MAX_MESSAGE_LENGTH])
                 
         except Exception as e:
             logger.error(f"Chat error: {e}")
@@ -193,7 +206,8 @@ class TelegramBot:
         """Start the Telegram bot"""
         logger.info("Starting Telegram bot...")
         
-        app = Application.builder().token(self.token).build()
+        # Handle updates concurrently so one slow LLM reply doesn't stall other chats
+        app = Application.builder().token(self.token).concurrent_updates(True).build()
         
         # Register handlers
         app.add_handler(CommandHandler("start", self.start_command))
@@ -204,12 +218,18 @@ class TelegramBot:
         app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
         app.add_error_handler(self.error_handler)
         
-        # Start polling
-        app.run_polling(allowed_updates=Update.ALL_TYPES)
+        # Start polling; only messages are handled (commands arrive as messages too)
+        app.run_polling(allowed_updates=[Update.MESSAGE])
 
 
 def main():
     """Entry point for Telegram bot"""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     bot = TelegramBot()
     bot.run()
 
@@ -12,19 +12,38 @@ Run modes:
 """
 
 import os
+import sys
+import hmac
+import json
+import struct
+import queue
+import logging
+import logging.handlers
 import time
-import uuid
+import secrets
+import threading
 import asyncio
+import hashlib
+import datetime
+import functools
+import itertools
+import multiprocessing
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Optional
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Literal, Optional, Union
 
-from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+import httpx
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
 from agent.chat import ChatService
-from agent.embedding import create_embedding_client
+from agent.embedding import EmbedResult, EmbeddingClient, create_embedding_client
 from agent.providers import (
     OllamaProvider,
     AnthropicProvider,
@@ -37,6 +56,8 @@ from agent.providers import (
 )
 from agent.mcp import ToolRegistry, McpClientManager, register_builtin_tools
 from agent.events import EventBus
+from agent.batching import MicroBatcher
+from agent import pdf_extract
 from agent.tools import ShellTool, FilesystemTool
 
 
@@ -44,6 +65,12 @@ from agent.tools import ShellTool, FilesystemTool
 # Request/Response Models
 # ============================================================================
 
+class RequestMessage(BaseModel):
+    """A role/content message in a request body, validated once on parse"""
+    role: str
+    content: Union[str, list[dict]]  # text, or content blocks
+
+
 class ChatRequest(BaseModel):
     """Chat completion request"""
     conversation_id: Optional[str] = None
@@ -56,16 +83,18 @@ class ChatRequest(BaseModel):
     api_key: Optional[str] = None
     base_url: Optional[str] = None
     extra_config: Optional[dict] = None
+    # Per-turn retrieved context; sent as its own message, never merged into system_prompt
+    context: Optional[str] = None
     # Tool support
     tools_enabled: bool = False
     # Message history from Rust (SQLite source of truth).
     # When provided, replaces sidecar's in-memory history for this conversation.
-    history: Optional[list[dict]] = None
+    history: Optional[list[RequestMessage]] = None
 
 
 class ChatMessageRequest(BaseModel):
     """Direct message request (no conversation)"""
-    messages: list[dict]
+    messages: list[RequestMessage]
     provider: Optional[str] = "ollama"
     model: Optional[str] = None
     temperature: float = 0.7
@@ -109,6 +138,9 @@ class McpDisconnectRequest(BaseModel):
 # Application Setup
 # ============================================================================
 
+LOG_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+logger = logging.getLogger("sidecar")
+
 chat_service: ChatService = None
 tool_registry: ToolRegistry = None
 mcp_client: McpClientManager = None
@@ -118,72 +150,139 @@ event_bus: EventBus = None
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize services on startup"""
-    global chat_service, tool_registry, mcp_client, event_bus
+    global chat_service, tool_registry, mcp_client, event_bus, _EXTRACT_POOL, _PDF_POOL
+
+    # Log records go through a queue and are written by a listener thread, so
+    # logging from handlers never blocks the loop on a slow stdout pipe
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger.propagate = False
+    log_listener.start()
+
+    # FilesystemTool (and other asyncio.to_thread work) runs on the default
+    # executor; size it explicitly so disk I/O can't starve or flood the loop
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=int(os.getenv("FS_WORKERS", "8")), thread_name_prefix="io")
+    )
+
     chat_service = ChatService()
     tool_registry = ToolRegistry()
     mcp_client = McpClientManager(tool_registry)
     event_bus = EventBus()
 
-    # Register built-in tools
-    shell_tool = ShellTool(mode=os.getenv("TOOLS_MODE", "restricted"))
-    fs_tool = FilesystemTool(mode=os.getenv("TOOLS_MODE", "restricted"))
-    register_builtin_tools(tool_registry, shell_tool, fs_tool)
-    print(f"[mcp] Registered {len(tool_registry.get_all())} built-in tools")
+    # Register built-in tools (the same instances back the /tools/* endpoints)
+    register_builtin_tools(tool_registry, shell_tool, filesystem_tool)
+    logger.info("[mcp] Registered %d built-in tools", len(tool_registry.get_all()))
 
     # Configure Ollama (local LLM)
     ollama_host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
     ollama_model = os.getenv("OLLAMA_MODEL", "llama3.2")
+    # Same variable the Ollama server reads; set it (and OLLAMA_MAX_LOADED_MODELS)
+    # on the Ollama side too, otherwise concurrent chats still queue there
+    ollama_parallel = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
     chat_service.register_provider(OllamaProvider(
         base_url=ollama_host,
         default_model=ollama_model,
+        num_parallel=ollama_parallel,
     ))
 
     # Configure Anthropic (if API key is set)
     if os.getenv("ANTHROPIC_API_KEY"):
         chat_service.register_provider(AnthropicProvider())
-        print("✓ Anthropic provider enabled")
+        logger.info("✓ Anthropic provider enabled")
 
     # Configure OpenAI (if API key is set)
     if os.getenv("OPENAI_API_KEY"):
         chat_service.register_provider(OpenAIProvider())
-        print("✓ OpenAI provider enabled")
+        logger.info("✓ OpenAI provider enabled")
 
     # Configure Google AI / Gemini (if API key is set)
     if os.getenv("GOOGLE_API_KEY"):
         chat_service.register_provider(GoogleProvider())
-        print("✓ Google AI (Gemini) provider enabled")
+        logger.info("✓ Google AI (Gemini) provider enabled")
+
+    logger.info("🤖 AI Studio Sidecar initialized")
+    logger.info("   Ollama: %s (model: %s, parallel: %d)", ollama_host, ollama_model, ollama_parallel)
+
+    # Open provider connections (TLS handshake, HTTP/2 session) in the
+    # background so the first chat doesn't pay for them; also seeds /status
+    provider_prewarm = asyncio.create_task(_provider_health())
 
-    print(f"🤖 AI Studio Sidecar initialized")
-    print(f"   Ollama: {ollama_host} (model: {ollama_model})")
+    # Optionally launch Chromium in the background so the first browser
+    # action doesn't pay the multi-second cold start
+    browser_prewarm = None
+    if os.getenv("BROWSER_PREWARM", "").lower() in ("1", "true", "yes"):
+        browser_prewarm = asyncio.create_task(browser_tool.start())
 
     yield
 
     # Cleanup: disconnect all MCP servers
     await mcp_client.shutdown()
+    await shell_tool.aclose()
+    if browser_prewarm is not None:
+        browser_prewarm.cancel()
+        await asyncio.gather(browser_prewarm, return_exceptions=True)
+    await browser_tool.stop()
+    provider_prewarm.cancel()
+    for provider in chat_service.providers.values():
+        await provider.aclose()
+    # Cached instances only borrow the shared clients
+    _PROVIDER_CACHE.clear()
+    _EMBED_CLIENT_CACHE.clear()
+    for http_client in _SHARED_HTTP_CLIENTS.values():
+        await http_client.aclose()
+    _SHARED_HTTP_CLIENTS.clear()
+    if _EXTRACT_POOL is not None:
+        _EXTRACT_POOL.shutdown(wait=False, cancel_futures=True)
+        _EXTRACT_POOL = None
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown(cancel_futures=True)
+        _PDF_POOL = None
+    log_listener.stop()
+    logger.removeHandler(queue_handler)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (FastAPI's own class is deprecated)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 
 app = FastAPI(
     title="AI Studio Agent",
     description="Multi-provider LLM agent server with MCP tool support",
     version="0.2.0",
+    # Routes with a response_model still take FastAPI's Pydantic fast path
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
 # Optional auth token injected by the desktop app.
 AI_STUDIO_TOKEN = os.getenv("AI_STUDIO_TOKEN")
+_EXPECTED_TOKEN_BYTES = AI_STUDIO_TOKEN.encode("utf-8") if AI_STUDIO_TOKEN else None
+
+
+def _token_matches(token: Any) -> bool:
+    """Constant-time comparison with AI_STUDIO_TOKEN; a missing or non-str token fails."""
+    return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), _EXPECTED_TOKEN_BYTES)
 
 @app.middleware("http")
 async def auth_middleware(request: Request, call_next):
-    if not AI_STUDIO_TOKEN:
+    if _EXPECTED_TOKEN_BYTES is None:
         return await call_next(request)
 
     # Allow unauthenticated health checks (used for startup probing).
-    if request.url.path == "/health":
+    if request.scope["path"] == "/health":
         return await call_next(request)
 
-    token = request.headers.get("x-ai-studio-token")
-    if token != AI_STUDIO_TOKEN:
-        return JSONResponse(status_code=401, content={"detail": "Unauthorized"})
+    if not _token_matches(request.headers.get("x-ai-studio-token")):
+        return ORJSONResponse(status_code=401, content={"detail": "Unauthorized"})
 
     return await call_next(request)
 
@@ -201,6 +300,28 @@ app.add_middleware(
 # Dynamic Provider Creation
 # ============================================================================
 
+_PROVIDER_FACTORIES: dict[str, Callable[[Optional[str], Optional[str], dict], AgentProvider]] = {
+    "anthropic": lambda api_key, base_url, cfg: AnthropicProvider(api_key=api_key or ""),
+    "google": lambda api_key, base_url, cfg: GoogleProvider(api_key=api_key or ""),
+    "azure_openai": lambda api_key, base_url, cfg: AzureOpenAIProvider(
+        endpoint=base_url or cfg.get("endpoint", ""),
+        api_key=api_key or "",
+        deployment=cfg.get("deployment", ""),
+        api_version=cfg.get("api_version", "2024-02-01"),
+    ),
+    "local": lambda api_key, base_url, cfg: LocalOpenAIProvider(
+        base_url=base_url or cfg.get("base_url", "http://localhost:11434/v1"),
+        api_key=api_key or "",
+        model_name=cfg.get("model_name", ""),
+    ),
+    "openai": lambda api_key, base_url, cfg: OpenAIProvider(api_key=api_key or ""),
+    "ollama": lambda api_key, base_url, cfg: OllamaProvider(
+        base_url=base_url or "http://localhost:11434",
+        default_model=cfg.get("model_name", "llama3.2"),
+    ),
+}
+
+
 def create_provider_for_request(
     name: str,
     api_key: Optional[str] = None,
@@ -208,40 +329,103 @@ def create_provider_for_request(
     extra_config: Optional[dict] = None,
 ) -> AgentProvider:
     """Create a provider instance from per-request config."""
-    cfg = extra_config or {}
-
-    if name == "anthropic":
-        return AnthropicProvider(api_key=api_key or "")
-    elif name == "google":
-        return GoogleProvider(api_key=api_key or "")
-    elif name == "azure_openai":
-        return AzureOpenAIProvider(
-            endpoint=base_url or cfg.get("endpoint", ""),
-            api_key=api_key or "",
-            deployment=cfg.get("deployment", ""),
-            api_version=cfg.get("api_version", "2024-02-01"),
-        )
-    elif name == "local":
-        return LocalOpenAIProvider(
-            base_url=base_url or cfg.get("base_url", "http://localhost:11434/v1"),
-            api_key=api_key or "",
-            model_name=cfg.get("model_name", ""),
-        )
-    elif name == "openai":
-        return OpenAIProvider(api_key=api_key or "")
-    elif name == "ollama":
-        return OllamaProvider(
-            base_url=base_url or "http://localhost:11434",
-            default_model=cfg.get("model_name", "llama3.2"),
-        )
-    else:
+    factory = _PROVIDER_FACTORIES.get(name)
+    if factory is None:
         raise ValueError(f"Unknown provider: {name}")
+    return factory(api_key, base_url, extra_config or {})
+
+
+# Per-request provider configs repeat constantly (the desktop app sends the
+# same settings every call); reuse the instance and its connection pool.
+_PROVIDER_CACHE: "OrderedDict[tuple, AgentProvider]" = OrderedDict()
+_PROVIDER_CACHE_MAX = 32
+
+# Cached providers and embedding clients borrow one pooled client per
+# transport setting (client_key) instead of owning one, so evicting an
+# instance leaves no sockets behind; these are closed at shutdown.
+_SHARED_HTTP_CLIENTS: dict[tuple, httpx.AsyncClient] = {}
+
+
+def _share_http_client(owner: Union[AgentProvider, EmbeddingClient]) -> None:
+    """Point owner at the shared pooled client for its settings."""
+    key = owner.client_key
+    client = _SHARED_HTTP_CLIENTS.get(key)
+    if client is None or client.is_closed:
+        client = _SHARED_HTTP_CLIENTS[key] = owner.new_client()
+    owner.client = client
+
+
+def _config_key(
+    name: str,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    extra_config: Optional[dict],
+) -> tuple:
+    """Cache key for a per-request config; the API key is kept only as a hash."""
+    return (
+        name,
+        hashlib.sha256(api_key.encode()).hexdigest()[:16] if api_key else None,
+        base_url,
+        orjson.dumps(extra_config, option=orjson.OPT_SORT_KEYS) if extra_config else None,
+    )
+
+
+def get_provider_for_request(
+    name: str,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    extra_config: Optional[dict] = None,
+) -> AgentProvider:
+    """Like create_provider_for_request, but returns a cached instance for a known config."""
+    key = _config_key(name, api_key, base_url, extra_config)
+    provider = _PROVIDER_CACHE.get(key)
+    if provider is not None:
+        _PROVIDER_CACHE.move_to_end(key)
+        return provider
+
+    provider = create_provider_for_request(name, api_key, base_url, extra_config)
+    _share_http_client(provider)
+    _PROVIDER_CACHE[key] = provider
+    if len(_PROVIDER_CACHE) > _PROVIDER_CACHE_MAX:
+        _PROVIDER_CACHE.popitem(last=False)
+    return provider
 
 
 # ============================================================================
 # Health & Status Endpoints
 # ============================================================================
 
+def _ttl_cache(ttl: float):
+    """Cache a no-argument coroutine function's result for `ttl` seconds.
+
+    Concurrent callers share one in-flight call; failures are not cached.
+    """
+    def decorator(fn):
+        expires_at = 0.0
+        task: Optional[asyncio.Task] = None
+
+        @functools.wraps(fn)
+        async def wrapper():
+            nonlocal expires_at, task
+            now = time.monotonic()
+            stale = task is None or now >= expires_at or (
+                task.done() and (task.cancelled() or task.exception() is not None)
+            )
+            if stale:
+                task = asyncio.ensure_future(fn())
+                expires_at = now + ttl
+            return await asyncio.shield(task)
+
+        return wrapper
+    return decorator
+
+
+@_ttl_cache(ttl=5.0)
+async def _provider_health() -> dict[str, bool]:
+    """Provider health, shared across bursts of /status polls."""
+    return await chat_service.health_check()
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint"""
@@ -251,7 +435,7 @@ async def health():
 @app.get("/status")
 async def status():
     """Detailed status including provider health and MCP"""
-    provider_health = await chat_service.health_check()
+    provider_health = await _provider_health()
     mcp_servers = {
         name: "connected" for name in mcp_client.get_connected_servers()
     }
@@ -291,7 +475,11 @@ async def test_provider(request: ProviderTestRequest):
             base_url=request.base_url,
             extra_config=request.extra_config,
         )
-        healthy = await provider.health()
+        try:
+            healthy = await provider.health()
+        finally:
+            # One-off instance: don't leave its pooled client open
+            await provider.aclose()
         return {"success": healthy, "message": "Connected" if healthy else "Health check failed"}
     except Exception as e:
         return {"success": False, "message": str(e)}
@@ -310,6 +498,9 @@ class EmbedRequest(BaseModel):
     api_key: Optional[str] = None
     base_url: Optional[str] = None
     extra_config: Optional[dict] = None
+    # "f32"/"f16" return the vectors as packed little-endian floats
+    # (application/octet-stream, rows x dims in X-Shape) instead of JSON
+    dtype: Literal["json", "f32", "f16"] = "json"
 
 
 class EmbedResponse(BaseModel):
@@ -320,6 +511,114 @@ class EmbedResponse(BaseModel):
     usage: dict
 
 
+# Same reuse as _PROVIDER_CACHE: knowledge-base ingest calls /embed many
+# times with one config, so keep each client's connection pool warm
+_EMBED_CLIENT_CACHE: "OrderedDict[tuple, EmbeddingClient]" = OrderedDict()
+_EMBED_CLIENT_CACHE_MAX = 32
+
+
+def get_embedding_client_for_request(
+    provider: str,
+    api_key: str = "",
+    base_url: str = "",
+    extra_config: Optional[dict] = None,
+) -> EmbeddingClient:
+    """create_embedding_client with a cached instance per config."""
+    key = _config_key(provider, api_key, base_url, extra_config)
+    client = _EMBED_CLIENT_CACHE.get(key)
+    if client is not None:
+        _EMBED_CLIENT_CACHE.move_to_end(key)
+        return client
+
+    client = create_embedding_client(provider, api_key, base_url, extra_config)
+    _share_http_client(client)
+    _EMBED_CLIENT_CACHE[key] = client
+    if len(_EMBED_CLIENT_CACHE) > _EMBED_CLIENT_CACHE_MAX:
+        _EMBED_CLIENT_CACHE.popitem(last=False)
+    return client
+
+
+# Optional cross-request batching for /embed: concurrent calls for the same
+# client/model within the window go out as one embed() call. Off by default
+# (0) since it adds up to the window to each call's latency.
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "0"))
+
+
+async def _run_embed_batch(key, batch: list[list[str]]) -> list[EmbedResult]:
+    """One embed() call for every request in the window, split back per request.
+
+    Usage is shared out by each request's share of the characters sent.
+    """
+    client, model = key
+    merged = [text for texts in batch for text in texts]
+    result = await client.embed(merged, model)
+
+    total_chars = sum(map(len, merged)) or 1
+    results = []
+    offset = 0
+    for texts in batch:
+        share = sum(map(len, texts)) / total_chars
+        results.append(EmbedResult(
+            vectors=result.vectors[offset:offset + len(texts)],
+            model=result.model,
+            dimensions=result.dimensions,
+            usage={k: round(v * share) for k, v in result.usage.items()},
+        ))
+        offset += len(texts)
+    return results
+
+
+embed_batcher = MicroBatcher(
+    _run_embed_batch,
+    # Flush early once the window holds this many (estimated) tokens
+    max_batch=int(os.getenv("EMBED_BATCH_MAX_TOKENS", "32768")),
+    max_wait=EMBED_BATCH_WINDOW_MS / 1000,
+    weight=lambda texts: sum(map(len, texts)) // 4,
+)
+
+
+_F16_PACK_CHUNK = 4096
+
+
+def _packed_vectors_response(result: EmbedResult, dtype: str) -> Response:
+    """Vectors as one row-major buffer of little-endian floats.
+
+    A fraction of the JSON size (4 or 2 bytes per value); shape, dtype and
+    usage travel in headers.
+    """
+    flat = [x for vector in result.vectors for x in vector]
+    if dtype == "f16":
+        # Packed in slices so no call gets millions of arguments
+        try:
+            content = b"".join(
+                struct.pack(f"<{len(chunk)}e", *chunk)
+                for chunk in (
+                    flat[start:start + _F16_PACK_CHUNK]
+                    for start in range(0, len(flat), _F16_PACK_CHUNK)
+                )
+            )
+        except OverflowError:
+            raise HTTPException(
+                status_code=422,
+                detail="Embedding values exceed the float16 range (±65504); use dtype 'f32' or 'json'",
+            )
+    else:
+        packed = array("f", flat)
+        if sys.byteorder == "big":
+            packed.byteswap()
+        content = packed.tobytes()
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={
+            "X-Shape": f"{len(result.vectors)}x{result.dimensions}",
+            "X-Dtype": "float16" if dtype == "f16" else "float32",
+            "X-Model": result.model,
+            "X-Usage": orjson.dumps(result.usage).decode(),
+        },
+    )
+
+
 @app.post("/embed", response_model=EmbedResponse)
 async def embed(request: EmbedRequest):
     """Generate embeddings for a list of texts. Used by Knowledge Base node."""
@@ -329,20 +628,28 @@ async def embed(request: EmbedRequest):
         if len(request.texts) > 10000:
             raise HTTPException(status_code=400, detail="Maximum 10000 texts per request")
 
-        client = create_embedding_client(
+        client = get_embedding_client_for_request(
             provider=request.provider,
             api_key=request.api_key or "",
             base_url=request.base_url or "",
             extra_config=request.extra_config,
         )
-        result = await client.embed(request.texts, request.model)
-
-        return EmbedResponse(
-            vectors=result.vectors,
-            model=result.model,
-            dimensions=result.dimensions,
-            usage=result.usage,
-        )
+        if EMBED_BATCH_WINDOW_MS > 0:
+            result = await embed_batcher.submit((client, request.model), request.texts)
+        else:
+            result = await client.embed(request.texts, request.model)
+
+        if request.dtype != "json":
+            return _packed_vectors_response(result, request.dtype)
+
+        # Vectors can be megabytes of floats: skip response_model validation
+        # and encode straight to bytes with orjson (the schema still documents it)
+        return ORJSONResponse({
+            "vectors": result.vectors,
+            "model": result.model,
+            "dimensions": result.dimensions,
+            "usage": result.usage,
+        })
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
@@ -359,6 +666,9 @@ class ExtractRequest(BaseModel):
     """Extract text from a binary document (PDF, DOCX, XLSX, PPTX)"""
     path: str
     format: Optional[str] = None  # auto-detected from extension if omitted
+    # Stream the text as text/plain (metadata in X-* headers) rather than
+    # returning it inside a JSON body
+    stream: bool = False
 
 
 class ExtractResponse(BaseModel):
@@ -371,32 +681,89 @@ class ExtractResponse(BaseModel):
     char_count: int
 
 
+_FORMAT_MAP = {
+    '.pdf': 'pdf',
+    '.docx': 'docx',
+    '.xlsx': 'xlsx',
+    '.xls': 'xlsx',
+    '.pptx': 'pptx',
+}
+
+
 def _detect_format(path: str) -> str:
-    ext = os.path.splitext(path)[1].lower()
-    format_map = {
-        '.pdf': 'pdf',
-        '.docx': 'docx',
-        '.xlsx': 'xlsx',
-        '.xls': 'xlsx',
-        '.pptx': 'pptx',
-    }
-    fmt = format_map.get(ext)
+    # Only the final component may carry the extension ("a.d/Makefile" has none)
+    dot = path.rfind('.')
+    ext = path[dot:].lower() if dot > max(path.rfind('/'), path.rfind('\\')) + 1 else ''
+    fmt = _FORMAT_MAP.get(ext)
     if not fmt:
         raise ValueError(f"Unsupported file format: {ext}")
     return fmt
 
 
+# PDFs with at least this many pages are split into page ranges and
+# extracted in parallel worker processes; shorter ones aren't worth the IPC
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+
+
+_EXTRACT_POOL: Optional[ThreadPoolExecutor] = None
+
+# Pools are created lazily from extract threads as well as the event loop;
+# without this two racing callers could each build one and leak the loser
+_POOL_LOCK = threading.Lock()
+
+
+def _extract_pool() -> ThreadPoolExecutor:
+    # Separate from the default (filesystem) executor so a burst of large
+    # documents can't starve file tools; long PDFs fan out further to _PDF_POOL
+    global _EXTRACT_POOL
+    with _POOL_LOCK:
+        if _EXTRACT_POOL is None:
+            _EXTRACT_POOL = ThreadPoolExecutor(
+                max_workers=int(os.getenv("EXTRACT_WORKERS", str(max(2, (os.cpu_count() or 1) // 2)))),
+                thread_name_prefix="extract",
+            )
+        return _EXTRACT_POOL
+
+
+def _pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    with _POOL_LOCK:
+        if _PDF_POOL is None:
+            # spawn, not fork: the server process has live threads and an event loop
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PDF_POOL
+
+
 def _extract_pdf(path: str) -> dict:
-    from pypdf import PdfReader
-    reader = PdfReader(path)
-    pages = []
-    for page in reader.pages:
-        text = page.extract_text() or ''
-        if text.strip():
-            pages.append(text)
+    doc = pdf_extract.open_pdf(path)
+    try:
+        num_pages = pdf_extract.page_count(doc)
+        workers = os.cpu_count() or 1
+
+        if num_pages < PDF_PARALLEL_MIN_PAGES or workers < 2:
+            texts = pdf_extract.page_texts(doc, 0, num_pages)
+        else:
+            # Oversubscribe (2 ranges per core) so uneven pages balance out
+            size = max(8, num_pages // (workers * 2))
+            starts = range(0, num_pages, size)
+            ends = [min(lo + size, num_pages) for lo in starts]
+            texts = [
+                text
+                for part in _pdf_pool().map(
+                    pdf_extract.pdf_page_texts, itertools.repeat(path), starts, ends,
+                )
+                for text in part
+            ]
+    finally:
+        pdf_extract.close_pdf(doc)
+
     return {
-        'text': '\n\n'.join(pages),
-        'pages': len(reader.pages),
+        'text': '\n\n'.join(text for text in texts if text.strip()),
+        'pages': num_pages,
     }
 
 
@@ -404,32 +771,78 @@ def _extract_docx(path: str) -> dict:
     import docx
     doc = docx.Document(path)
     parts = []
+    # python-docx rebuilds .text from the XML on every access, so read it once;
+    # isspace() tests for blank text without stripping a copy
     for para in doc.paragraphs:
-        if para.text.strip():
-            parts.append(para.text)
+        text = para.text
+        if text and not text.isspace():
+            parts.append(text)
     # Also extract table content
     for table in doc.tables:
         for row in table.rows:
-            cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+            cells = [text.strip() for cell in row.cells if (text := cell.text) and not text.isspace()]
             if cells:
                 parts.append('\t'.join(cells))
     return {'text': '\n'.join(parts)}
 
 
+def _calamine_cell(c) -> str:
+    # Print cells the way openpyxl does: calamine reports every number as
+    # float, and date-only cells as date where openpyxl gives a midnight datetime
+    if type(c) is float and c.is_integer():
+        return str(int(c))
+    if type(c) is datetime.date:
+        return str(datetime.datetime.combine(c, datetime.time()))
+    return str(c)
+
+
+def _extract_xlsx_calamine(path: str) -> dict:
+    from python_calamine import CalamineWorkbook
+    wb = CalamineWorkbook.from_path(path)
+    parts = []
+    for name in wb.sheet_names:
+        rows = [
+            '\t'.join(['' if c is None else _calamine_cell(c) for c in row])
+            for row in wb.get_sheet_by_name(name).to_python()
+            if any(c is not None and c != '' for c in row)
+        ]
+        if rows:
+            parts.append(f'## Sheet: {name}\n' + '\n'.join(rows))
+    return {
+        'text': '\n\n'.join(parts),
+        'sheets': wb.sheet_names,
+    }
+
+
 def _extract_xlsx(path: str) -> dict:
+    # python-calamine (Rust) is much faster and lighter than openpyxl, and
+    # also reads legacy .xls; openpyxl remains the fallback
+    try:
+        return _extract_xlsx_calamine(path)
+    except ImportError:
+        pass
+    except Exception:
+        # A workbook calamine rejects still gets an openpyxl attempt; openpyxl
+        # can't read legacy .xls, so calamine's error is the useful one there
+        if path.lower().endswith('.xls'):
+            raise
+
     from openpyxl import load_workbook
     wb = load_workbook(path, read_only=True, data_only=True)
-    sheet_names = wb.sheetnames
-    parts = []
-    for ws in wb.worksheets:
-        rows = []
-        for row in ws.iter_rows(values_only=True):
-            cells = [str(c) if c is not None else '' for c in row]
-            if any(c for c in cells):
-                rows.append('\t'.join(cells))
-        if rows:
-            parts.append(f'## Sheet: {ws.title}\n' + '\n'.join(rows))
-    wb.close()
+    try:
+        sheet_names = wb.sheetnames
+        parts = []
+        for ws in wb.worksheets:
+            # Skip blank rows on the raw tuple, before stringifying any cell
+            rows = [
+                '\t'.join(['' if c is None else str(c) for c in row])
+                for row in ws.iter_rows(values_only=True)
+                if any(c is not None and c != '' for c in row)
+            ]
+            if rows:
+                parts.append(f'## Sheet: {ws.title}\n' + '\n'.join(rows))
+    finally:
+        wb.close()
     return {
         'text': '\n\n'.join(parts),
         'sheets': sheet_names,
@@ -445,8 +858,9 @@ def _extract_pptx(path: str) -> dict:
         for shape in slide.shapes:
             if shape.has_text_frame:
                 for para in shape.text_frame.paragraphs:
-                    if para.text.strip():
-                        texts.append(para.text)
+                    text = para.text
+                    if text and not text.isspace():
+                        texts.append(text)
         if texts:
             slides.append(f'## Slide {i}\n' + '\n'.join(texts))
     return {
@@ -455,29 +869,61 @@ def _extract_pptx(path: str) -> dict:
     }
 
 
+_EXTRACTORS = {
+    'pdf': _extract_pdf,
+    'docx': _extract_docx,
+    'xlsx': _extract_xlsx,
+    'pptx': _extract_pptx,
+}
+
+
+def _iter_text_chunks(text: str, size: int = 65536):
+    """UTF-8 encode a large string a slice at a time (no full-size copy)."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size].encode()
+
+
+@functools.lru_cache(maxsize=int(os.getenv("EXTRACT_CACHE_SIZE", "32")))
+def _cached_extract(path: str, mtime_ns: int, size: int, fmt: str) -> dict:
+    """Extraction result for one version of a file. Editing the file changes
+    (mtime, size), so stale entries are never hit. Shared — never mutate."""
+    return _EXTRACTORS[fmt](path)
+
+
 @app.post("/extract", response_model=ExtractResponse)
 async def extract_text(request: ExtractRequest):
     """Extract text from PDF, DOCX, XLSX, or PPTX files. Used by Knowledge Base node."""
     try:
-        if not os.path.exists(request.path):
+        try:
+            st = os.stat(request.path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail=f"File not found: {request.path}")
 
         fmt = request.format or _detect_format(request.path)
 
-        extractors = {
-            'pdf': _extract_pdf,
-            'docx': _extract_docx,
-            'xlsx': _extract_xlsx,
-            'pptx': _extract_pptx,
-        }
-
-        extractor = extractors.get(fmt)
-        if not extractor:
+        if fmt not in _EXTRACTORS:
             raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
 
-        result = extractor(request.path)
+        # Parsing blocks for up to seconds; keep it off the event loop
+        result = await asyncio.get_running_loop().run_in_executor(
+            _extract_pool(), _cached_extract, request.path, st.st_mtime_ns, st.st_size, fmt,
+        )
         text = result.get('text', '')
 
+        if request.stream:
+            headers = {"X-Format": fmt, "X-Char-Count": str(len(text))}
+            for key in ('pages', 'slides'):
+                if result.get(key) is not None:
+                    headers[f"X-{key.capitalize()}"] = str(result[key])
+            if result.get('sheets') is not None:
+                # Header values go out as Latin-1, so keep the JSON ASCII-escaped
+                headers["X-Sheets"] = json.dumps(result['sheets'])
+            return StreamingResponse(
+                _iter_text_chunks(text),
+                media_type="text/plain; charset=utf-8",
+                headers=headers,
+            )
+
         return ExtractResponse(
             text=text,
             format=fmt,
@@ -498,6 +944,71 @@ async def extract_text(request: ExtractRequest):
 # Chat Endpoints
 # ============================================================================
 
+# (role, content) from a RequestMessage in one C-level call
+_role_content = attrgetter("role", "content")
+
+
+def _prepare_conversation(request: ChatRequest, conversation_id: str) -> Optional[AgentProvider]:
+    """Shared setup for /chat and /chat/conversation/stream: provider and history.
+
+    Returns the per-request provider when the request carries its own config,
+    else None (the registered provider is used).
+    """
+    # Per-request provider config is used for this call only; registering it
+    # on the shared service would swap providers under concurrent requests
+    provider = None
+    if request.provider and (request.api_key or request.base_url or request.extra_config):
+        provider = get_provider_for_request(
+            name=request.provider,
+            api_key=request.api_key,
+            base_url=request.base_url,
+            extra_config=request.extra_config,
+        )
+
+    # Create conversation with system prompt if provided
+    if request.system_prompt and conversation_id not in chat_service.conversations:
+        chat_service.create_conversation(
+            conversation_id,
+            provider_name=request.provider,
+            system_prompt=request.system_prompt,
+        )
+
+    # Hydrate from Rust-provided history (SQLite is source of truth)
+    if request.history is not None:
+        conv = chat_service.get_or_create_conversation(
+            conversation_id, provider_name=request.provider,
+            system_prompt=request.system_prompt,
+        )
+        # Build messages: keep system prompt if present, replace the rest.
+        # Strip the last user message from history — chat()/chat_with_tools()/chat_stream()
+        # will re-append it from request.message, avoiding duplication (R1 fix).
+        system_msgs = [m for m in conv.messages if m.role == "system"]
+        # Each turn's history is usually the previous one plus the new turns;
+        # reuse the Messages built for the shared prefix
+        raw = list(map(_role_content, request.history))
+        prev_raw, prev_msgs = conv.hydrated_history or ([], [])
+        start = len(prev_raw) if raw[:len(prev_raw)] == prev_raw else 0
+        # History entries are RequestMessages, validated when the body was
+        # parsed; skip validating them again as Message
+        history_msgs = prev_msgs[:start] + [
+            Message.model_construct(role=role, content=content)
+            for role, content in raw[start:]
+        ]
+        conv.hydrated_history = (raw, history_msgs)
+        if history_msgs and history_msgs[-1].role == "user":
+            history_msgs = history_msgs[:-1]
+        conv.messages = system_msgs + history_msgs
+
+    return provider
+
+
+# Tool-definition format per provider
+_TOOLS_BY_PROVIDER: dict[str, Callable[[ToolRegistry], list[dict]]] = {
+    "anthropic": ToolRegistry.get_anthropic_tools,
+    "google": ToolRegistry.get_google_tools,
+}
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
@@ -506,49 +1017,17 @@ async def chat(request: ChatRequest):
     """
     try:
         # Generate conversation ID if not provided
-        conversation_id = request.conversation_id or f"conv_{uuid.uuid4().hex[:8]}"
-
-        # If per-request provider config provided, create and register provider on-the-fly
-        if request.provider and (request.api_key or request.base_url or request.extra_config):
-            provider = create_provider_for_request(
-                name=request.provider,
-                api_key=request.api_key,
-                base_url=request.base_url,
-                extra_config=request.extra_config,
-            )
-            chat_service.register_provider(provider)
+        conversation_id = request.conversation_id or "conv_" + secrets.token_urlsafe(6)
 
-        # Create conversation with system prompt if provided
-        if request.system_prompt and conversation_id not in chat_service.conversations:
-            chat_service.create_conversation(
-                conversation_id,
-                provider_name=request.provider,
-                system_prompt=request.system_prompt,
-            )
-
-        # Hydrate from Rust-provided history (SQLite is source of truth)
-        if request.history is not None:
-            conv = chat_service.get_or_create_conversation(
-                conversation_id, provider_name=request.provider,
-                system_prompt=request.system_prompt,
-            )
-            # Build messages: keep system prompt if present, replace the rest.
-            # Strip the last user message from history — chat()/chat_with_tools()
-            # will re-append it from request.message, avoiding duplication (R1 fix).
-            system_msgs = [m for m in conv.messages if m.role == "system"]
-            history_msgs = [Message(role=m["role"], content=m["content"]) for m in request.history]
-            if history_msgs and history_msgs[-1].role == "user":
-                history_msgs = history_msgs[:-1]
-            conv.messages = system_msgs + history_msgs
+        provider_override = _prepare_conversation(request, conversation_id)
 
         # Get tool definitions for the provider
+        # Other providers: tools not yet supported, silently skip. An empty
+        # registry yields [] and falls through to simple chat.
         tool_definitions = None
-        if request.tools_enabled and tool_registry and len(tool_registry.get_all()) > 0:
-            if request.provider == "anthropic":
-                tool_definitions = tool_registry.get_anthropic_tools()
-            elif request.provider == "google":
-                tool_definitions = tool_registry.get_google_tools()
-            # Other providers: tools not yet supported, silently skip
+        get_tools = _TOOLS_BY_PROVIDER.get(request.provider)
+        if request.tools_enabled and tool_registry and get_tools:
+            tool_definitions = get_tools(tool_registry)
 
         if tool_definitions:
             # Use tool-calling loop
@@ -558,10 +1037,12 @@ async def chat(request: ChatRequest):
                 provider_name=request.provider,
                 model=request.model,
                 temperature=request.temperature,
+                context=request.context,
                 tool_definitions=tool_definitions,
                 tool_registry=tool_registry,
                 mcp_client=mcp_client,
                 event_bus=event_bus,
+                provider_override=provider_override,
             )
 
             # Serialize tool calls for the response
@@ -577,17 +1058,19 @@ async def chat(request: ChatRequest):
                 for tc in result.tool_calls
             ]
 
-            return ChatResponse(
-                conversation_id=conversation_id,
-                content=result.response.content,
-                model=result.response.model,
-                provider=result.response.provider,
-                usage={
+            # Fields come from our own provider objects: skip response_model
+            # validation and encode straight to bytes (the schema still documents it)
+            return ORJSONResponse({
+                "conversation_id": conversation_id,
+                "content": result.response.content,
+                "model": result.response.model,
+                "provider": result.response.provider,
+                "usage": {
                     "prompt_tokens": result.total_input_tokens,
                     "completion_tokens": result.total_output_tokens,
                 },
-                tool_calls=serialized_tools if serialized_tools else None,
-            )
+                "tool_calls": serialized_tools if serialized_tools else None,
+            })
         else:
             # Simple chat (no tools)
             if event_bus:
@@ -604,6 +1087,8 @@ async def chat(request: ChatRequest):
                     provider_name=request.provider,
                     model=request.model,
                     temperature=request.temperature,
+                    context=request.context,
+                    provider_override=provider_override,
                 )
             except Exception as e:
                 llm_duration = int((time.monotonic() - llm_start) * 1000)
@@ -636,13 +1121,14 @@ async def chat(request: ChatRequest):
                     },
                 )
 
-            return ChatResponse(
-                conversation_id=conversation_id,
-                content=response.content,
-                model=response.model,
-                provider=response.provider,
-                usage=response.usage,
-            )
+            return ORJSONResponse({
+                "conversation_id": conversation_id,
+                "content": response.content,
+                "model": response.model,
+                "provider": response.provider,
+                "usage": response.usage,
+                "tool_calls": None,
+            })
 
     except ValueError as e:
         if event_bus and conversation_id:
@@ -663,23 +1149,28 @@ async def chat(request: ChatRequest):
 
 
 def _prepare_chat_request(request: ChatMessageRequest):
-    """Shared setup for /chat/direct and /chat/stream: provider, messages, session."""
-    import json as _json
-    print(f"[chat] provider={request.provider} model={request.model} "
-          f"base_url={request.base_url} extra_config={request.extra_config} "
-          f"msgs={len(request.messages)} session={request.conversation_id or 'none'}")
+    """Shared setup for /chat/direct and /chat/stream: provider, messages, session.
+
+    Also returns this turn's request messages as Message objects, built once
+    and shared between the provider call and session history.
+    """
+    logger.debug(
+        "[chat] provider=%s model=%s base_url=%s extra_config=%s msgs=%d session=%s",
+        request.provider, request.model, request.base_url, request.extra_config,
+        len(request.messages), request.conversation_id or "none",
+    )
 
-    # Register provider on-the-fly if config provided
+    # Per-request provider config is used for this call only (not registered)
+    provider = None
     if request.provider and (request.api_key or request.base_url or request.extra_config):
-        provider_inst = create_provider_for_request(
+        provider = get_provider_for_request(
             name=request.provider,
             api_key=request.api_key,
             base_url=request.base_url,
             extra_config=request.extra_config,
         )
-        chat_service.register_provider(provider_inst)
     else:
-        print(f"[chat] WARN: No dynamic config — using default provider for '{request.provider}'")
+        logger.debug("[chat] No dynamic config — using default provider for '%s'", request.provider)
 
     messages = []
     if request.system_prompt:
@@ -698,54 +1189,134 @@ def _prepare_chat_request(request: ChatMessageRequest):
         if len(history) > max_h:
             history = history[-max_h:]
         if history:
-            print(f"[chat] Session '{request.conversation_id}': injecting {len(history)} history messages")
+            logger.debug("[chat] Session '%s': injecting %d history messages", request.conversation_id, len(history))
             messages.extend(history)
 
     # Build current messages — inject images into multimodal content if present
     if request.images:
-        print(f"[chat] Vision mode: {len(request.images)} image(s) attached")
+        logger.debug("[chat] Vision mode: %d image(s) attached", len(request.images))
+        # Build each data URI once; every message shares the same blocks
+        image_blocks = [
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:{img['mime_type']};base64,{img['data']}"},
+            }
+            for img in request.images
+        ]
         for m in request.messages:
-            content_blocks = [{"type": "text", "text": m["content"]}]
-            for img in request.images:
-                data_uri = f"data:{img['mime_type']};base64,{img['data']}"
-                content_blocks.append({
-                    "type": "image_url",
-                    "image_url": {"url": data_uri},
-                })
-            messages.append(Message(role=m["role"], content=content_blocks))
+            content_blocks = [{"type": "text", "text": m.content}, *image_blocks]
+            messages.append(Message.model_construct(role=m.role, content=content_blocks))
+        # History keeps the text-only form of the turn
+        turn = [
+            Message.model_construct(role=role, content=content)
+            for role, content in map(_role_content, request.messages)
+        ] if conv else []
     else:
-        messages.extend(Message(role=m["role"], content=m["content"]) for m in request.messages)
+        # RequestMessage already validated role/content when the body was
+        # parsed; skip validating them again as Message
+        turn = [
+            Message.model_construct(role=role, content=content)
+            for role, content in map(_role_content, request.messages)
+        ]
+        messages.extend(turn)
+
+    if provider is None:
+        provider = chat_service.get_provider(request.provider or "ollama")
+    return provider, messages, conv, turn
+
+
+# Optional micro-batching for /chat/direct: concurrent calls to the same
+# provider/model/temperature within the window go out as one chat_batch().
+# Off by default (0) since it adds up to the window to each call's latency.
+CHAT_BATCH_WINDOW_MS = float(os.getenv("CHAT_BATCH_WINDOW_MS", "0"))
+
+
+async def _run_chat_batch(key, batch: list[list[Message]]):
+    provider, model, temperature = key
+    return await provider.chat_batch(batch, model=model, temperature=temperature)
+
 
-    provider = chat_service.get_provider(request.provider or "ollama")
-    return provider, messages, conv
+chat_batcher = MicroBatcher(
+    _run_chat_batch,
+    max_batch=int(os.getenv("CHAT_BATCH_MAX", "16")),
+    max_wait=CHAT_BATCH_WINDOW_MS / 1000,
+)
+
+
+# Response cache for stateless, near-deterministic /chat/direct calls
+# (workflow replays, eval runs). CHAT_CACHE_SIZE=0 disables it.
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1024"))
+CHAT_CACHE_MAX_TEMPERATURE = 0.3
+_chat_cache: "OrderedDict[bytes, dict]" = OrderedDict()
+
+# Every request field that can change the completion
+_CHAT_CACHE_FIELDS = {
+    "messages", "provider", "model", "temperature",
+    "api_key", "base_url", "extra_config", "system_prompt",
+}
+
+
+def _chat_cache_key(request: ChatMessageRequest) -> Optional[bytes]:
+    """Content hash for a cacheable request, or None when it must hit the provider."""
+    if (
+        not CHAT_CACHE_SIZE
+        or request.temperature > CHAT_CACHE_MAX_TEMPERATURE
+        or request.images
+        or request.conversation_id
+    ):
+        return None
+    payload = orjson.dumps(
+        request.model_dump(include=_CHAT_CACHE_FIELDS),
+        option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+    )
+    return hashlib.blake2b(payload, digest_size=16).digest()
 
 
 @app.post("/chat/direct")
-async def chat_direct(request: ChatMessageRequest):
+async def chat_direct(request: ChatMessageRequest, http_response: Response):
     """Direct chat without conversation history. Used by workflow LLM nodes.
     When conversation_id is provided, accumulates history across calls (session mode).
     """
+    cache_key = _chat_cache_key(request)
+    if cache_key is not None:
+        cached = _chat_cache.get(cache_key)
+        if cached is not None:
+            _chat_cache.move_to_end(cache_key)
+            http_response.headers["X-Cache"] = "HIT"
+            return cached
+        http_response.headers["X-Cache"] = "MISS"
+
     try:
-        provider, messages, conv = _prepare_chat_request(request)
+        provider, messages, conv, turn = _prepare_chat_request(request)
 
-        response = await provider.chat(
-            messages=messages,
-            model=request.model,
-            temperature=request.temperature,
-        )
+        if CHAT_BATCH_WINDOW_MS > 0:
+            response = await chat_batcher.submit(
+                (provider, request.model, request.temperature), messages
+            )
+        else:
+            response = await provider.chat(
+                messages=messages,
+                model=request.model,
+                temperature=request.temperature,
+            )
 
         # Session mode: store current turn in conversation history
         if conv is not None:
-            for m in request.messages:
-                conv.messages.append(Message(role=m["role"], content=m["content"]))
+            conv.messages.extend(turn)
             conv.messages.append(Message(role="assistant", content=response.content))
 
-        return {
+        result = {
             "content": response.content,
             "model": response.model,
             "provider": response.provider,
             "usage": response.usage,
         }
+        if cache_key is not None:
+            # No await between lookup and store, so no lock is needed
+            _chat_cache[cache_key] = result
+            if len(_chat_cache) > CHAT_CACHE_SIZE:
+                _chat_cache.popitem(last=False)
+        return result
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -758,10 +1329,8 @@ async def chat_stream_endpoint(request: ChatMessageRequest):
     """Streaming chat via SSE. Same request schema as /chat/direct.
     Returns text/event-stream with token/done/error chunks.
     """
-    import json as _json
-
     try:
-        provider, messages, conv = _prepare_chat_request(request)
+        provider, messages, conv, turn = _prepare_chat_request(request)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -781,17 +1350,54 @@ async def chat_stream_endpoint(request: ChatMessageRequest):
                     accumulated = chunk.get('content', accumulated)
                     # Session mode: store history after stream completes
                     if conv is not None:
-                        for m in request.messages:
-                            conv.messages.append(Message(role=m["role"], content=m["content"]))
+                        conv.messages.extend(turn)
                         conv.messages.append(Message(role="assistant", content=accumulated))
-                yield f"data: {_json.dumps(chunk)}\n\n"
+                yield b"data: " + orjson.dumps(chunk) + b"\n\n"
         except Exception as e:
-            print(f"[chat/stream] ERROR: {e}")
-            yield f"data: {_json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            logger.error("[chat/stream] %s", e)
+            yield b"data: " + orjson.dumps({"type": "error", "message": str(e)}) + b"\n\n"
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
 
+@app.post("/chat/conversation/stream")
+async def chat_conversation_stream(request: ChatRequest):
+    """Streaming /chat via SSE: same schema, same conversation memory.
+    Returns text/event-stream with token/done/error chunks; the conversation
+    ID is in the X-Conversation-Id header. Tool calling is not streamed —
+    use /chat for tools_enabled requests.
+    """
+    conversation_id = request.conversation_id or "conv_" + secrets.token_urlsafe(6)
+    try:
+        provider_override = _prepare_conversation(request, conversation_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Chat setup error: {str(e)}")
+
+    async def generate():
+        try:
+            async for chunk in chat_service.chat_stream(
+                conversation_id=conversation_id,
+                user_message=request.message,
+                provider_name=request.provider,
+                model=request.model,
+                temperature=request.temperature,
+                context=request.context,
+                provider_override=provider_override,
+            ):
+                yield b"data: " + orjson.dumps(chunk) + b"\n\n"
+        except Exception as e:
+            logger.error("[chat/conversation/stream] %s", e)
+            yield b"data: " + orjson.dumps({"type": "error", "message": str(e)}) + b"\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"X-Conversation-Id": conversation_id},
+    )
+
+
 class ToolExecuteRequest(BaseModel):
     """Execute a single tool by name"""
     tool_name: str
@@ -887,7 +1493,7 @@ async def events_ws(websocket: WebSocket):
     if AI_STUDIO_TOKEN:
         try:
             msg = await asyncio.wait_for(websocket.receive_json(), timeout=5.0)
-            if msg.get("type") != "auth" or msg.get("token") != AI_STUDIO_TOKEN:
+            if msg.get("type") != "auth" or not _token_matches(msg.get("token")):
                 await websocket.close(code=4001, reason="Unauthorized")
                 return
         except Exception:
@@ -895,7 +1501,7 @@ async def events_ws(websocket: WebSocket):
             return
 
     queue = event_bus.subscribe()
-    print("[ws] Event subscriber connected")
+    logger.info("[ws] Event subscriber connected")
     try:
         while True:
             msg = await queue.get()
@@ -906,20 +1512,29 @@ async def events_ws(websocket: WebSocket):
         pass
     finally:
         event_bus.unsubscribe(queue)
-        print("[ws] Event subscriber disconnected")
+        logger.info("[ws] Event subscriber disconnected")
 
 
 # ============================================================================
 # Tools Endpoints (Legacy — direct tool access)
 # ============================================================================
 
-# Initialize tools with restricted mode by default
-shell_tool = ShellTool(mode=os.getenv("TOOLS_MODE", "restricted"))
+# Initialize tools with restricted mode by default; created once at import
+# and shared by the MCP built-ins and the direct endpoints below
+shell_tool = ShellTool(
+    mode=os.getenv("TOOLS_MODE", "restricted"),
+    persistent=os.getenv("SHELL_PERSISTENT", "").lower() in ("1", "true", "yes"),
+)
 filesystem_tool = FilesystemTool(mode=os.getenv("TOOLS_MODE", "restricted"))
 
 from agent.tools import BrowserTool
 browser_tool = BrowserTool(headless=True)
 
+# How long a browser action waits for the browser to start before giving up
+BROWSER_READY_TIMEOUT = float(os.getenv("BROWSER_READY_TIMEOUT", "10"))
+# The tool drives a single page, so concurrent actions take turns on it
+_browser_lock = asyncio.Lock()
+
 
 class ShellRequest(BaseModel):
     """Shell command request"""
@@ -938,7 +1553,7 @@ class FilesystemRequest(BaseModel):
 
 class BrowserRequest(BaseModel):
     """Browser action request"""
-    action: str  # navigate, screenshot, click, fill, extract_text, get_html, evaluate
+    action: str  # navigate, screenshot, click, fill, extract_text, get_html, extract, evaluate
     url: Optional[str] = None
     selector: Optional[str] = None
     value: Optional[str] = None
@@ -962,32 +1577,29 @@ async def run_shell(request: ShellRequest):
     }
 
 
+_FS_ACTIONS: dict[str, Callable[[FilesystemRequest], Awaitable[Any]]] = {
+    "read": lambda r: filesystem_tool.read(r.path),
+    "write": lambda r: filesystem_tool.write(r.path, r.content or ""),
+    "append": lambda r: filesystem_tool.append(r.path, r.content or ""),
+    "delete": lambda r: filesystem_tool.delete(r.path),
+    "list_dir": lambda r: filesystem_tool.list_dir(r.path),
+    "mkdir": lambda r: filesystem_tool.mkdir(r.path),
+    "exists": lambda r: filesystem_tool.exists(r.path),
+    "copy": lambda r: filesystem_tool.copy(r.path, r.dest or ""),
+    "move": lambda r: filesystem_tool.move(r.path, r.dest or ""),
+}
+
+
 @app.post("/tools/filesystem")
 async def run_filesystem(request: FilesystemRequest):
     """Perform filesystem operations."""
     action = request.action.lower()
-
-    if action == "read":
-        result = filesystem_tool.read(request.path)
-    elif action == "write":
-        result = filesystem_tool.write(request.path, request.content or "")
-    elif action == "append":
-        result = filesystem_tool.append(request.path, request.content or "")
-    elif action == "delete":
-        result = filesystem_tool.delete(request.path)
-    elif action == "list_dir":
-        result = filesystem_tool.list_dir(request.path)
-    elif action == "mkdir":
-        result = filesystem_tool.mkdir(request.path)
-    elif action == "exists":
-        result = filesystem_tool.exists(request.path)
-    elif action == "copy":
-        result = filesystem_tool.copy(request.path, request.dest or "")
-    elif action == "move":
-        result = filesystem_tool.move(request.path, request.dest or "")
-    else:
+    handler = _FS_ACTIONS.get(action)
+    if handler is None:
         raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
 
+    result = await handler(request)
+
     return {
         "success": result.success,
         "action": result.action,
@@ -1011,35 +1623,53 @@ async def browser_stop():
     return {"success": result.success, "error": result.error}
 
 
+_BROWSER_ACTIONS: dict[str, Callable[[BrowserRequest], Awaitable[Any]]] = {
+    "navigate": lambda r: browser_tool.navigate(r.url or ""),
+    "screenshot": lambda r: browser_tool.screenshot(),
+    "click": lambda r: browser_tool.click(r.selector or ""),
+    "fill": lambda r: browser_tool.fill(r.selector or "", r.value or ""),
+    "extract_text": lambda r: browser_tool.extract_text(r.selector or "body"),
+    "get_html": lambda r: browser_tool.get_html(r.selector or "body"),
+    "extract": lambda r: browser_tool.extract(r.selector or "body"),
+    "evaluate": lambda r: browser_tool.evaluate(r.script or ""),
+    "wait_for": lambda r: browser_tool.wait_for(r.selector or ""),
+}
+
+
 @app.post("/tools/browser")
 async def run_browser(request: BrowserRequest):
     """Perform browser actions."""
     action = request.action.lower()
-
-    if action == "navigate":
-        result = await browser_tool.navigate(request.url or "")
-    elif action == "screenshot":
-        result = await browser_tool.screenshot()
-    elif action == "click":
-        result = await browser_tool.click(request.selector or "")
-    elif action == "fill":
-        result = await browser_tool.fill(request.selector or "", request.value or "")
-    elif action == "extract_text":
-        result = await browser_tool.extract_text(request.selector or "body")
-    elif action == "get_html":
-        result = await browser_tool.get_html(request.selector or "body")
-    elif action == "evaluate":
-        result = await browser_tool.evaluate(request.script or "")
-    elif action == "wait_for":
-        result = await browser_tool.wait_for(request.selector or "")
-    else:
+    handler = _BROWSER_ACTIONS.get(action)
+    if handler is None:
         raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
 
+    if not browser_tool.ready.is_set():
+        # Lazy start: start() coalesces concurrent callers behind its own lock.
+        # Shield it so a timed-out request doesn't abort a launch in progress.
+        try:
+            started = await asyncio.wait_for(
+                asyncio.shield(browser_tool.start()), BROWSER_READY_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Browser is still starting")
+        if not started.success:
+            return _browser_response(started)
+
+    async with _browser_lock:
+        result = await handler(request)
+
+    return _browser_response(result)
+
+
+def _browser_response(result) -> dict:
+    """Serialize a BrowserResult for the /tools/browser endpoints"""
     return {
         "success": result.success,
         "action": result.action,
         "data": result.data,
         "screenshot": result.screenshot,
+        "screenshot_mime": result.screenshot_mime,
         "error": result.error,
     }
 
@@ -1054,9 +1684,40 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "127.0.0.1")
     port = int(os.getenv("PORT", "8765"))
 
-    print(f"\n🚀 Starting AI Studio Agent Server")
-    print(f"   URL: http://{host}:{port}")
-    print(f"   Docs: http://{host}:{port}/docs")
-    print(f"\n   Press Ctrl+C to stop\n")
-
-    uvicorn.run(app, host=host, port=port)
+    # uvloop and httptools ship with uvicorn[standard]; uvloop is unavailable on Windows
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+
+    # Conversations, MCP connections, the browser and the /events bus live in
+    # process memory, so extra workers don't share them. Opt-in only.
+    workers = int(os.getenv("WORKERS", "1"))
+
+    # Before the loop starts, records from the "sidecar" logger reach this
+    # root handler; lifespan then switches them to the queued handler
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format=LOG_FORMAT)
+    logger.info("🚀 Starting AI Studio Agent Server")
+    logger.info("   URL: http://%s:%d", host, port)
+    logger.info("   Docs: http://%s:%d/docs", host, port)
+    if workers > 1:
+        logger.info("   Workers: %d (in-memory state is per worker)", workers)
+    logger.info("   Press Ctrl+C to stop")
+
+    uvicorn.run(
+        # Multiple workers need an import string so each process can load the app
+        "server:app" if workers > 1 else app,
+        host=host,
+        port=port,
+        loop=loop,
+        http=http,
+        workers=workers,
+        log_level="warning",
+        access_log=False,
+    )
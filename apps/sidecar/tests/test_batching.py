@@ -0,0 +1,84 @@
+"""Tests for MicroBatcher."""
+import asyncio
+import os
+import sys
+
+# Add sidecar root to path so we can import server modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.batching import MicroBatcher
+
+
+class Recorder:
+    """Batch handler that records each call and upper-cases its items."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, key, items):
+        self.calls.append((key, list(items)))
+        return [item.upper() for item in items]
+
+
+def _gather(batcher, submissions):
+    async def main():
+        return await asyncio.gather(
+            *(batcher.submit(key, item) for key, item in submissions),
+            return_exceptions=True,
+        )
+    return asyncio.run(main())
+
+
+def test_coalesces_per_key():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, max_batch=16, max_wait=0.01)
+    results = _gather(batcher, [('a', 'x'), ('b', 'y'), ('a', 'z')])
+    assert results == ['X', 'Y', 'Z']
+    assert sorted(handler.calls) == [('a', ['x', 'z']), ('b', ['y'])]
+
+def test_flushes_at_max_batch():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, max_batch=2, max_wait=10)
+    results = _gather(batcher, [('a', 'p'), ('a', 'q'), ('a', 'r'), ('a', 's')])
+    assert results == ['P', 'Q', 'R', 'S']
+    assert handler.calls == [('a', ['p', 'q']), ('a', ['r', 's'])]
+
+def test_exception_result_goes_to_its_caller_only():
+    async def handler(key, items):
+        return [ValueError(item) if item == 'bad' else item for item in items]
+
+    batcher = MicroBatcher(handler, max_wait=0.01)
+    ok, bad = _gather(batcher, [('a', 'ok'), ('a', 'bad')])
+    assert ok == 'ok'
+    assert isinstance(bad, ValueError)
+
+def test_handler_error_reaches_every_caller():
+    async def handler(key, items):
+        raise ConnectionError('down')
+
+    batcher = MicroBatcher(handler, max_wait=0.01)
+    results = _gather(batcher, [('a', 1), ('a', 2)])
+    assert all(isinstance(r, ConnectionError) for r in results)
+
+def test_result_count_mismatch_fails_the_batch():
+    async def handler(key, items):
+        return items[:1]
+
+    batcher = MicroBatcher(handler, max_wait=0.01)
+    results = _gather(batcher, [('a', 1), ('a', 2)])
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert '1 results for 2 items' in str(results[0])
+
+def test_flushes_at_max_batch_weight():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, max_batch=10, max_wait=0.05, weight=len)
+    results = _gather(batcher, [('a', 'aaaa'), ('a', 'bbbbbb'), ('a', 'c')])
+    assert results == ['AAAA', 'BBBBBB', 'C']
+    # 4 + 6 reaches the weight limit; 'c' waits for its own flush
+    assert handler.calls == [('a', ['aaaa', 'bbbbbb']), ('a', ['c'])]
+
+def test_heavy_item_flushes_alone():
+    handler = Recorder()
+    batcher = MicroBatcher(handler, max_batch=3, max_wait=10, weight=len)
+    assert _gather(batcher, [('a', 'long')]) == ['LONG']
+    assert handler.calls == [('a', ['long'])]
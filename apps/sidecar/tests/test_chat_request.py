@@ -0,0 +1,34 @@
+"""Tests for chat request validation."""
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+# Add sidecar root to path so we can import server modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from server import app, ChatMessageRequest, ChatRequest
+
+client = TestClient(app)
+
+
+def test_messages_parse_into_request_messages():
+    request = ChatMessageRequest(messages=[{'role': 'user', 'content': 'hi', 'id': 7}])
+    assert request.messages[0].role == 'user'
+    assert request.messages[0].content == 'hi'
+
+def test_history_accepts_content_blocks():
+    request = ChatRequest(message='hi', history=[{'role': 'user', 'content': [{'type': 'text', 'text': 'a'}]}])
+    assert request.history[0].content == [{'type': 'text', 'text': 'a'}]
+
+def test_direct_rejects_null_content():
+    response = client.post('/chat/direct', json={'messages': [{'role': 'user', 'content': None}]})
+    assert response.status_code == 422
+
+def test_direct_rejects_non_str_role():
+    response = client.post('/chat/direct', json={'messages': [{'role': 1, 'content': 'hi'}]})
+    assert response.status_code == 422
+
+def test_chat_rejects_bad_history():
+    response = client.post('/chat', json={'message': 'hi', 'history': [{'role': 'user'}]})
+    assert response.status_code == 422
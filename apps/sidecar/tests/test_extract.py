@@ -9,6 +9,29 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from server import _detect_format, _extract_docx, _extract_xlsx, _extract_pptx, _extract_pdf
 
 FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+DOCX_PATH = os.path.join(FIXTURES, 'test.docx')
+XLSX_PATH = os.path.join(FIXTURES, 'test.xlsx')
+PPTX_PATH = os.path.join(FIXTURES, 'test.pptx')
+PDF_PATH = os.path.join(FIXTURES, 'test.pdf')
+
+
+# Each fixture document is extracted once per run and shared by its tests
+
+@pytest.fixture(scope='session')
+def docx_result():
+    return _extract_docx(DOCX_PATH)
+
+@pytest.fixture(scope='session')
+def xlsx_result():
+    return _extract_xlsx(XLSX_PATH)
+
+@pytest.fixture(scope='session')
+def pptx_result():
+    return _extract_pptx(PPTX_PATH)
+
+@pytest.fixture(scope='session')
+def pdf_result():
+    return _extract_pdf(PDF_PATH)
 
 
 # ---------- Format detection ----------
@@ -39,59 +62,87 @@ def test_detect_no_extension():
 
 # ---------- DOCX extraction ----------
 
-def test_extract_docx_paragraphs():
-    result = _extract_docx(os.path.join(FIXTURES, 'test.docx'))
-    assert 'Hello from AI Studio' in result['text']
-    assert 'test document for RAG extraction' in result['text']
+def test_extract_docx_paragraphs(docx_result):
+    assert 'Hello from AI Studio' in docx_result['text']
+    assert 'test document for RAG extraction' in docx_result['text']
 
-def test_extract_docx_tables():
-    result = _extract_docx(os.path.join(FIXTURES, 'test.docx'))
-    assert 'Alice' in result['text']
-    assert 'Engineer' in result['text']
+def test_extract_docx_tables(docx_result):
+    assert 'Alice' in docx_result['text']
+    assert 'Engineer' in docx_result['text']
 
 
 # ---------- XLSX extraction ----------
 
-def test_extract_xlsx_data():
-    result = _extract_xlsx(os.path.join(FIXTURES, 'test.xlsx'))
+def test_extract_xlsx_data(xlsx_result):
+    assert 'Tokyo' in xlsx_result['text']
+    assert '14000000' in xlsx_result['text']
+
+def test_extract_xlsx_sheet_names(xlsx_result):
+    assert xlsx_result['sheets'] == ['Data']
+
+def test_extract_xlsx_header(xlsx_result):
+    assert 'City' in xlsx_result['text']
+    assert 'Population' in xlsx_result['text']
+
+def _no_calamine(path):
+    raise ImportError('python_calamine')
+
+def test_extract_xlsx_openpyxl_fallback(monkeypatch):
+    """Without python-calamine, openpyxl produces the same text."""
+    import server
+    monkeypatch.setattr(server, '_extract_xlsx_calamine', _no_calamine)
+    result = _extract_xlsx(XLSX_PATH)
+    assert result['sheets'] == ['Data']
     assert 'Tokyo' in result['text']
     assert '14000000' in result['text']
 
-def test_extract_xlsx_sheet_names():
-    result = _extract_xlsx(os.path.join(FIXTURES, 'test.xlsx'))
-    assert result['sheets'] == ['Data']
+def test_extract_xlsx_calamine_error_falls_back(monkeypatch):
+    """A workbook calamine fails to parse is retried with openpyxl."""
+    import server
+
+    def broken(path):
+        raise RuntimeError('calamine could not parse')
+
+    monkeypatch.setattr(server, '_extract_xlsx_calamine', broken)
+    assert 'Tokyo' in _extract_xlsx(XLSX_PATH)['text']
 
-def test_extract_xlsx_header():
-    result = _extract_xlsx(os.path.join(FIXTURES, 'test.xlsx'))
-    assert 'City' in result['text']
-    assert 'Population' in result['text']
+def test_extract_xlsx_dates_match_openpyxl(tmp_path, monkeypatch):
+    import datetime
+    import server
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    wb.active.append([datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, 5), 3, 1.5])
+    path = str(tmp_path / 'dates.xlsx')
+    wb.save(path)
+
+    native = _extract_xlsx(path)['text']
+    monkeypatch.setattr(server, '_extract_xlsx_calamine', _no_calamine)
+    assert native == _extract_xlsx(path)['text']
+    assert '2024-01-02 00:00:00' in native
 
 
 # ---------- PPTX extraction ----------
 
-def test_extract_pptx_slides():
-    result = _extract_pptx(os.path.join(FIXTURES, 'test.pptx'))
-    assert 'AI Studio Overview' in result['text']
-    assert 'open-source IDE for AI agents' in result['text']
+def test_extract_pptx_slides(pptx_result):
+    assert 'AI Studio Overview' in pptx_result['text']
+    assert 'open-source IDE for AI agents' in pptx_result['text']
 
-def test_extract_pptx_slide_count():
-    result = _extract_pptx(os.path.join(FIXTURES, 'test.pptx'))
-    assert result['slides'] == 2
+def test_extract_pptx_slide_count(pptx_result):
+    assert pptx_result['slides'] == 2
 
-def test_extract_pptx_second_slide():
-    result = _extract_pptx(os.path.join(FIXTURES, 'test.pptx'))
-    assert '23 node types' in result['text']
+def test_extract_pptx_second_slide(pptx_result):
+    assert '23 node types' in pptx_result['text']
 
 
 # ---------- PDF extraction ----------
 
-def test_extract_pdf_text():
-    result = _extract_pdf(os.path.join(FIXTURES, 'test.pdf'))
+def test_extract_pdf_text(pdf_result):
     # Our minimal PDF has "Hello from PDF"
-    assert result['pages'] == 1
+    assert pdf_result['pages'] == 1
     # pypdf may or may not extract text from our minimal handcrafted PDF
     # but it should not crash
-    assert isinstance(result['text'], str)
+    assert isinstance(pdf_result['text'], str)
 
 
 # ---------- Edge cases ----------
@@ -112,3 +163,25 @@ def test_extract_empty_result():
         os.unlink(f.name)
     assert 'text' in result
     assert isinstance(result['text'], str)
+
+
+# ---------- /extract endpoint ----------
+
+def test_extract_stream_non_latin1_sheet_names(tmp_path):
+    """Sheet names travel in an ASCII-escaped X-Sheets header."""
+    import json
+    from fastapi.testclient import TestClient
+    from openpyxl import Workbook
+    from server import app
+
+    wb = Workbook()
+    wb.active.title = 'Лист1'
+    wb.create_sheet('数据')['A1'] = 'hello'
+    path = tmp_path / 'unicode.xlsx'
+    wb.save(path)
+
+    response = TestClient(app).post('/extract', json={'path': str(path), 'stream': True})
+    assert response.status_code == 200
+    assert response.headers['x-sheets'].isascii()
+    assert json.loads(response.headers['x-sheets']) == ['Лист1', '数据']
+    assert 'hello' in response.text
@@ -0,0 +1,130 @@
+"""Tests for FilesystemTool path checks and reads."""
+import os
+import sys
+
+import pytest
+
+# Add sidecar root to path so we can import server modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.tools.filesystem import FilesystemTool
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    ws = tmp_path / 'ws'
+    ws.mkdir()
+    return ws
+
+
+@pytest.fixture
+def secret(tmp_path):
+    outside = tmp_path / 'secret'
+    outside.mkdir()
+    key = outside / 'key'
+    key.write_text('TOPSECRET\n')
+    return key
+
+
+# ---------- Sandbox ----------
+
+def test_sandboxed_read_inside_workspace(workspace):
+    (workspace / 'notes.txt').write_text('hello')
+    fs = FilesystemTool(mode='sandboxed', workspace=str(workspace))
+    result = fs._read_sync('notes.txt')
+    assert result.success
+    assert result.data == 'hello'
+
+def test_sandboxed_rejects_parent_escape(workspace, secret):
+    fs = FilesystemTool(mode='sandboxed', workspace=str(workspace))
+    result = fs._read_sync('../secret/key')
+    assert not result.success
+    assert 'outside workspace' in result.error
+
+def test_sandboxed_rejects_symlink_swapped_after_first_access(workspace, secret):
+    """A path first seen as missing must be re-resolved once it becomes a symlink."""
+    fs = FilesystemTool(mode='sandboxed', workspace=str(workspace))
+    assert fs._read_sync('k').error == 'File not found'
+
+    os.symlink(secret, workspace / 'k')
+    result = fs._read_sync('k')
+    assert not result.success
+    assert 'outside workspace' in result.error
+    assert result.data is None
+
+def test_sandboxed_rejects_file_replaced_by_symlink(workspace, secret):
+    target = workspace / 'k'
+    target.write_text('inside')
+    fs = FilesystemTool(mode='sandboxed', workspace=str(workspace))
+    assert fs._read_sync('k').data == 'inside'
+
+    target.unlink()
+    os.symlink(secret, target)
+    result = fs._read_sync('k')
+    assert not result.success
+    assert 'outside workspace' in result.error
+
+def test_sandboxed_workspace_prefix_is_not_inside(tmp_path, workspace):
+    """'/x/ws-other' shares a string prefix with '/x/ws' but is outside it."""
+    sibling = tmp_path / 'ws-other'
+    sibling.mkdir()
+    (sibling / 'f').write_text('no')
+    fs = FilesystemTool(mode='sandboxed', workspace=str(workspace))
+    assert not fs._read_sync(str(sibling / 'f')).success
+
+def test_restricted_blocks_sensitive_paths():
+    fs = FilesystemTool(mode='restricted')
+    allowed, reason = fs._is_allowed('/etc/passwd')
+    assert not allowed
+    assert "'/etc'" in reason
+    assert fs._is_allowed('/tmp/ok.txt') == (True, '')
+
+
+# ---------- Reads ----------
+
+def _report_size(monkeypatch, size):
+    """Make os.fstat report st_size=size (like /proc files, or a file still growing)."""
+    real_fstat = os.fstat
+
+    class Stat:
+        def __init__(self, st):
+            self._st = st
+            self.st_size = size
+
+        def __getattr__(self, name):
+            return getattr(self._st, name)
+
+    monkeypatch.setattr(os, 'fstat', lambda fd: Stat(real_fstat(fd)))
+
+def test_read_full_content_when_st_size_understates(workspace, monkeypatch):
+    """st_size is only a hint: reads continue to EOF."""
+    content = 'x' * 200_000 + 'END'
+    (workspace / 'big.txt').write_text(content)
+    fs = FilesystemTool(mode='full', workspace=str(workspace))
+
+    _report_size(monkeypatch, 10)
+    result = fs._read_sync('big.txt')
+    assert result.success
+    assert result.data == content
+
+def test_read_zero_size_proc_file():
+    if not os.path.exists('/proc/self/status'):
+        pytest.skip('no procfs')
+    result = FilesystemTool(mode='full')._read_sync('/proc/self/status')
+    assert result.success
+    assert 'Name:' in result.data
+
+def test_read_limit_applies_to_bytes_read(workspace, monkeypatch):
+    (workspace / 'big.txt').write_text('y' * 1000)
+    fs = FilesystemTool(mode='full', workspace=str(workspace), max_file_size=100)
+
+    _report_size(monkeypatch, 0)
+    result = fs._read_sync('big.txt')
+    assert not result.success
+    assert 'too large' in result.error
+
+def test_read_empty_file(workspace):
+    (workspace / 'empty.txt').write_text('')
+    result = FilesystemTool(mode='full', workspace=str(workspace))._read_sync('empty.txt')
+    assert result.success
+    assert result.data == ''
@@ -0,0 +1,45 @@
+"""Tests for ShellTool's DANGEROUS_PATTERNS matchers."""
+import os
+import sys
+
+import pytest
+
+# Add sidecar root to path so we can import server modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agent.tools.shell import ShellTool, _build_pattern_matcher
+
+PATTERNS = tuple(ShellTool.DANGEROUS_PATTERNS)
+
+
+def _matcher(monkeypatch, *blocked):
+    """Build an uncached matcher with the given backend modules made unimportable."""
+    for name in blocked:
+        monkeypatch.setitem(sys.modules, name, None)
+    return _build_pattern_matcher.__wrapped__(PATTERNS)
+
+
+def _assert_flags_every_pattern(find):
+    for pattern in PATTERNS:
+        assert find(pattern) == pattern
+        assert find(f'echo x; {pattern} y') == pattern
+    assert find('ls -la /tmp') is None
+    assert find('') is None
+
+
+def test_hyperscan_matcher_flags_every_pattern(monkeypatch):
+    pytest.importorskip('hyperscan')
+    _assert_flags_every_pattern(_matcher(monkeypatch))
+
+def test_ahocorasick_matcher_flags_every_pattern(monkeypatch):
+    pytest.importorskip('ahocorasick')
+    _assert_flags_every_pattern(_matcher(monkeypatch, 'hyperscan'))
+
+def test_regex_matcher_flags_every_pattern(monkeypatch):
+    _assert_flags_every_pattern(_matcher(monkeypatch, 'hyperscan', 'ahocorasick'))
+
+def test_restricted_mode_blocks_dangerous_command():
+    allowed, reason = ShellTool(mode='restricted')._is_safe('sudo rm -rf /var')
+    assert not allowed
+    assert 'sudo rm' in reason
+    assert ShellTool(mode='restricted')._is_safe('ls -la') == (True, '')